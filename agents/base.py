@@ -10,7 +10,7 @@ from __future__ import annotations
 import logging
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Callable, Awaitable
+from typing import Any, Awaitable, Callable, Sequence
 
 
 logger = logging.getLogger(__name__)
@@ -18,17 +18,19 @@ logger = logging.getLogger(__name__)
 
 # ─── Config ──────────────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class BrowserConfig:
     """Konfigurasi browser untuk BrowserAgent."""
     headless: bool = True
     executable_path: str = 'C:/Program Files/Google/Chrome/Application/chrome.exe'
     max_steps: int = 50
+    reuse_session: bool = True  # pakai satu BrowserSession (keep_alive) lintas task
+    max_concurrency: int = 4    # maks task browser paralel jika reuse_session=False
 
 
 # ─── Context ─────────────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class AgentContext:
     """
     Konteks task yang mengalir dari channel ke supervisor ke agent.
@@ -43,15 +45,15 @@ class AgentContext:
     task_id: str | None = None         # DB task_id (diisi setelah task_create)
     on_update: Callable[[str], Awaitable[None]] | None = None
     # callback opsional untuk kirim update live (misal: "Browsing google.com...")
-    history: list[dict] = field(default_factory=list)
+    history: Sequence[dict] = field(default_factory=list)
     # percakapan sebelumnya dalam format OpenAI messages (tanpa system msg)
-    # diisi oleh Supervisor sebelum memanggil agent
+    # diisi oleh Supervisor sebelum memanggil agent (snapshot read-only)
     extra: dict[str, Any] = field(default_factory=dict)
 
 
 # ─── Result ──────────────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class AgentResult:
     """Hasil eksekusi satu agent."""
     success: bool
@@ -84,5 +86,9 @@ class BaseAgent(ABC):
         """Jalankan agent dengan konteks yang diberikan."""
         ...
 
+    async def close(self) -> None:
+        """Lepaskan resource milik agent (browser, koneksi, dll). Default: no-op."""
+        return None
+
     def __repr__(self) -> str:
         return f'<{self.__class__.__name__} name={self.name!r}>'
@@ -4,6 +4,11 @@ agents/browser.py — BrowserAgent
 Menggunakan browser-use Agent untuk autonomous web browsing.
 Screenshot selalu disimpan ke disk: agent diarahkan via system prompt
 untuk selalu menyertakan file_name saat memanggil action screenshot.
+
+Jika BrowserConfig.reuse_session aktif, satu BrowserSession (keep_alive)
+dipakai ulang lintas task sehingga Chrome tidak di-launch ulang tiap run;
+task dijalankan bergantian. Jika tidak, tiap task punya session sendiri dan
+maks BrowserConfig.max_concurrency task berjalan paralel.
 """
 
 from __future__ import annotations
@@ -13,7 +18,7 @@ import logging
 import time
 from typing import Any
 
-from browser_use import Agent
+from browser_use import Agent, Tools
 from browser_use.browser import BrowserProfile, BrowserSession
 
 from agents.base import AgentContext, AgentResult, BaseAgent, BrowserConfig
@@ -44,6 +49,78 @@ class BrowserAgent(BaseAgent):
     def __init__(self, llm: Any, config: BrowserConfig | None = None):
         super().__init__(llm)
         self.config = config or BrowserConfig()
+        self._session: BrowserSession | None = None
+        # Profile hanya bergantung pada config → validasi Pydantic sekali saja
+        self._browser_profile = BrowserProfile(
+            headless=self.config.headless,
+            executable_path=self.config.executable_path,
+            keep_alive=self.config.reuse_session,
+        )
+        # Registry action identik untuk semua task → bangun sekali, bukan per Agent
+        self._tools = Tools()
+        # Satu Agent per BrowserSession pada satu waktu
+        self._session_lock = asyncio.Lock()
+        # Session per task tidak berbagi state → cukup dibatasi jumlahnya
+        self._run_slots: asyncio.Lock | asyncio.Semaphore = (
+            self._session_lock if self.config.reuse_session
+            else asyncio.Semaphore(max(1, self.config.max_concurrency))
+        )
+
+    def _new_session(self) -> BrowserSession:
+        # BrowserSession menyalin profile ke instance-nya sendiri, jadi aman di-share
+        return BrowserSession(browser_profile=self._browser_profile)
+
+    def _get_session(self) -> BrowserSession:
+        """Kembalikan session persisten (reuse) atau session baru per task."""
+        if not self.config.reuse_session:
+            return self._new_session()
+        if self._session is None:
+            self._session = self._new_session()
+        return self._session
+
+    async def _discard_session(self) -> None:
+        """Matikan session persisten (misal setelah error) agar run berikutnya mulai bersih."""
+        session, self._session = self._session, None
+        if session is not None:
+            try:
+                await session.kill()
+            except Exception as e:
+                logger.debug(f'Gagal kill browser session: {e}')
+
+    @classmethod
+    def _postprocess(cls, history: Any) -> tuple[str, list[str], list[str], int, bool]:
+        """Ringkas history: (output, errors, attachments, steps, success)."""
+        output = history.final_result() or 'Task selesai tanpa output.'
+        errors, attachments = cls._collect_errors_and_attachments(history)
+        return output, errors, attachments, history.number_of_steps(), history.is_successful() is not False
+
+    @staticmethod
+    def _collect_errors_and_attachments(history: Any) -> tuple[list[str], list[str]]:
+        """
+        Satu pass atas history.history untuk error & attachment
+        (pengganti history.errors() + history.action_results()).
+        """
+        errors: list[str] = []
+        # dict sebagai ordered set: dedup O(1) per path, urutan tetap
+        seen: dict[str, None] = {}
+        for h in history.history:
+            step_error = None
+            for r in h.result:
+                if not r:
+                    continue
+                if step_error is None and r.error:
+                    step_error = r.error  # satu error per step, sama seperti errors()
+                if r.attachments:
+                    # ActionResult.attachments sudah list[str]; hash str di-cache oleh CPython
+                    seen.update(dict.fromkeys(p for p in r.attachments if p))
+            if step_error:
+                errors.append(step_error)
+        return errors, list(seen)
+
+    async def close(self) -> None:
+        """Tutup browser persisten saat shutdown."""
+        async with self._session_lock:
+            await self._discard_session()
 
     async def run(self, ctx: AgentContext) -> AgentResult:
         """Jalankan browser agent dengan task dari context."""
@@ -56,64 +133,84 @@ class BrowserAgent(BaseAgent):
         persona = get_persona()
         extend_msg = persona.build_browser_instruction()
 
-        browser_profile = BrowserProfile(
-            headless=self.config.headless,
-            executable_path=self.config.executable_path,
-        )
-        browser_session = BrowserSession(browser_profile=browser_profile)
+        # Step callback untuk live update ke channel.
+        # Update dikirim di background (tidak ditunggu) agar loop agent tidak
+        # tertahan round-trip channel; jika update sebelumnya masih jalan,
+        # update baru di-skip — progress bersifat lossy, step berikutnya menyusul.
+        inflight: set[asyncio.Task] = set()
+
+        async def _send_update(msg: str) -> None:
+            try:
+                await ctx.on_update(msg)
+            except Exception as e:
+                logger.debug(f'Step update error: {e}')
 
-        # Step callback untuk live update ke channel
         async def _step_cb(browser_state: Any, agent_output: Any, step_num: int) -> None:
-            if ctx.on_update is None:
+            if inflight:
                 return
             try:
                 actions = []
                 for action in agent_output.action:
-                    d = action.model_dump(exclude_none=True)
-                    for k in d:
-                        if k != 'index':
-                            actions.append(k)
-                            break
+                    # Nama action = field yang di-set; baca langsung tanpa serialisasi Pydantic
+                    name = next(
+                        (k for k in action.model_fields_set if k != 'index' and getattr(action, k, None) is not None),
+                        None,
+                    )
+                    if name is None:
+                        name = next((k for k in action.model_dump(exclude_none=True) if k != 'index'), None)
+                    if name:
+                        actions.append(name)
                 goal = agent_output.next_goal or ''
                 msg = f'[browser] step {step_num}: {", ".join(actions)}'
                 if goal:
                     msg += f' → {goal[:80]}'
-                await ctx.on_update(msg)
+                t = asyncio.create_task(_send_update(msg))
+                inflight.add(t)
+                t.add_done_callback(inflight.discard)
             except Exception as e:
                 logger.debug(f'Step cb error: {e}')
 
+        # Tanpa on_update tidak ada konsumen step → jangan daftarkan callback sama sekali
+        step_cb = _step_cb if ctx.on_update is not None else None
+
+        async with self._run_slots:
+            result = await self._run_agent(full_task, extend_msg, step_cb)
+        # Tunggu update step yang masih jalan, supaya tidak menimpa pesan
+        # "selesai" yang dikirim channel setelah run() kembali
+        if inflight:
+            await asyncio.gather(*inflight, return_exceptions=True)
+        return result
+
+    async def _run_agent(self, full_task: str, extend_msg: str, step_cb: Any) -> AgentResult:
+        browser_session = self._get_session()
         agent = Agent(
             task=full_task,
             llm=self.llm,
             browser_session=browser_session,
+            tools=self._tools,
             extend_system_message=extend_msg,
-            register_new_step_callback=_step_cb,
+            register_new_step_callback=step_cb,
         )
 
         try:
             history = await agent.run(max_steps=self.config.max_steps)
-            output = history.final_result() or 'Task selesai tanpa output.'
-            errors = [e for e in history.errors() if e]
-
-            attachments: list[str] = []
-            for ar in history.action_results():
-                if ar and ar.attachments:
-                    for p in ar.attachments:
-                        if p and p not in attachments:
-                            attachments.append(str(p))
+            # History panjang berisi banyak model Pydantic; olah di thread agar loop tetap responsif
+            output, errors, attachments, steps, success = await asyncio.to_thread(self._postprocess, history)
 
             return AgentResult(
-                success=history.is_successful() is not False,
+                success=success,
                 output=output,
                 agent_name=self.name,
-                steps=history.number_of_steps(),
+                steps=steps,
                 attachments=attachments,
                 errors=errors,
             )
         except asyncio.CancelledError:
+            await self._discard_session()
             raise
         except Exception as e:
             logger.exception(f'BrowserAgent error: {e}')
+            await self._discard_session()
             return AgentResult(
                 success=False,
                 output='',
@@ -12,10 +12,10 @@ from __future__ import annotations
 
 import logging
 import os
-
-from openai import AsyncOpenAI
+import time
 
 from agents.base import AgentContext, AgentResult, BaseAgent
+from agents.llm_client import get_openai_client
 from agents.persona import get_persona
 
 logger = logging.getLogger(__name__)
@@ -43,44 +43,76 @@ class ChatAgent(BaseAgent):
         'use browser agent for that.'
     )
 
+    # Jeda minimal antar progress update saat streaming (detik)
+    STREAM_UPDATE_INTERVAL = 1.0
+
     def __init__(self, llm: object) -> None:
         super().__init__(llm)
-        self._client = AsyncOpenAI(
-            api_key=os.environ.get('OPENAI_API_KEY', ''),
-            base_url=os.environ.get('OPENAI_BASE_URL', 'https://api.openai.com/v1'),
-        )
+        self._client = get_openai_client()
         self._model = os.environ.get('OPENAI_MODEL', 'gpt-4o')
+        # Pesan system statis di-reuse selama prompt persona tidak berubah
+        self._system_msg: dict = {'role': 'system', 'content': ''}
+
+    def _system_message(self, system: str) -> dict:
+        if self._system_msg['content'] is not system:
+            self._system_msg = {'role': 'system', 'content': system}
+        return self._system_msg
 
     async def run(self, ctx: AgentContext) -> AgentResult:
         """Jawab task menggunakan LLM langsung (tanpa browser)."""
 
-        # ── Susun system prompt dari persona + memory context ─────────────
+        # ── Susun system prompt statis dari persona ───────────────────────
+        # Memory context TIDAK digabung ke system prompt: prefix harus
+        # byte-identik antar panggilan agar prompt cache provider tetap hit.
         persona = get_persona()
-        system = persona.build_system_prompt(
-            extra=ctx.memory_context or ''
-        )
-
-        # ── Build messages: system + history + user ───────────────────────
-        messages: list[dict] = [{'role': 'system', 'content': system}]
-        if ctx.history:
-            messages.extend(ctx.history)
-        messages.append({'role': 'user', 'content': ctx.task})
-
+        system = persona.build_system_prompt()
+
+        # ── Build messages: system statis → memory → history → user ───────
+        # Dibangun sekali dalam satu list; prefix (system + history) tidak disalin ulang per item
+        memory_msgs = [{'role': 'system', 'content': ctx.memory_context.strip()}] if ctx.memory_context else []
+        messages: list[dict] = [
+            self._system_message(system),
+            *memory_msgs,
+            *ctx.history,
+            {'role': 'user', 'content': ctx.task},
+        ]
+
+        ai_name = persona.ai_name
         if ctx.on_update:
             try:
-                ai_name = persona.ai_name
                 await ctx.on_update(f'[chat] {ai_name} memproses...')
             except Exception:
                 pass
 
         try:
-            resp = await self._client.chat.completions.create(
+            stream = await self._client.chat.completions.create(
                 model=self._model,
                 messages=messages,
                 temperature=0.7,
                 max_tokens=2048,
+                stream=True,
             )
-            output = resp.choices[0].message.content or ''
+            # Kumpulkan delta; progress dikirim ter-throttle agar channel tidak kena rate limit
+            buf: list[str] = []
+            n_chars = 0
+            last_update = time.monotonic()
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                buf.append(delta)
+                n_chars += len(delta)
+                if ctx.on_update:
+                    now = time.monotonic()
+                    if now - last_update >= self.STREAM_UPDATE_INTERVAL:
+                        last_update = now
+                        try:
+                            await ctx.on_update(f'[chat] {ai_name} menulis jawaban... ({n_chars} karakter)')
+                        except Exception:
+                            pass
+            output = ''.join(buf)
             return AgentResult(
                 success=True,
                 output=output,
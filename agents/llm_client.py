@@ -0,0 +1,75 @@
+"""
+agents/llm_client.py — HTTP client bersama untuk panggilan OpenAI
+
+Semua AsyncOpenAI (ChatAgent, router Supervisor) memakai satu
+httpx.AsyncClient dengan connection pool terbatas, sehingga koneksi
+TLS ke API di-reuse lintas agent dan lintas request.
+HTTP/2 dipakai otomatis jika paket `h2` ter-install.
+
+AsyncOpenAI sendiri juga di-share: satu instance per (api_key, base_url).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+
+import httpx
+from openai import AsyncOpenAI
+
+try:
+    import h2  # noqa: F401
+
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+# ─── Shared httpx client ─────────────────────────────────────────────────────
+
+_http_client: httpx.AsyncClient | None = None
+_openai_clients: dict[tuple[str, str], AsyncOpenAI] = {}
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Kembalikan httpx.AsyncClient bersama. Buat jika belum ada."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=_HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        )
+        logger.debug(f'Shared LLM HTTP client created (http2={_HTTP2_AVAILABLE})')
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Tutup httpx.AsyncClient bersama (dipanggil saat shutdown)."""
+    global _http_client
+    _openai_clients.clear()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        logger.debug('Shared LLM HTTP client closed')
+
+
+# ─── Shared AsyncOpenAI ──────────────────────────────────────────────────────
+
+def get_openai_client(api_key: str | None = None, base_url: str | None = None) -> AsyncOpenAI:
+    """
+    Kembalikan AsyncOpenAI bersama untuk (api_key, base_url).
+    Default diambil dari OPENAI_API_KEY / OPENAI_BASE_URL.
+    """
+    if api_key is None:
+        api_key = os.environ.get('OPENAI_API_KEY', '')
+    if base_url is None:
+        base_url = os.environ.get('OPENAI_BASE_URL', 'https://api.openai.com/v1')
+    key = (api_key, base_url)
+    client = _openai_clients.get(key)
+    if client is None:
+        client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=get_http_client())
+        _openai_clients[key] = client
+    return client
@@ -12,12 +12,36 @@ Supervisor memanggil agent ini ketika user ingin:
 from __future__ import annotations
 
 import logging
+import re
 
 import db
 from agents.base import AgentContext, AgentResult, BaseAgent
+from agents.memory_writer import memory_writer
 
 logger = logging.getLogger(__name__)
 
+# Kata kunci perintah dicocokkan per kata utuh (bukan substring) supaya
+# misal "clearly" atau "showroom" tidak salah terdeteksi.
+_TOKEN_RE = re.compile(r'\w+')
+_DELETE_WORDS = frozenset({
+    'hapus', 'hapuskan', 'menghapus', 'forget', 'delete', 'clear',
+    'lupa', 'lupakan', 'bersihkan', 'membersihkan',
+})
+_LIST_WORDS = frozenset({'list', 'tampilkan', 'show'})
+_LIST_PHRASES = frozenset({('ingat', 'apa'), ('tau', 'apa'), ('apa', 'yang')})
+_SAVE_PREFIX_RE = re.compile(
+    r'^(?:ingat bahwa |ingat |remember that |remember |simpan |save |catat |note )(?P<content>.*)',
+    re.IGNORECASE | re.DOTALL,
+)
+# Prefix simpan yang eksplisit: dicek SEBELUM kata kunci hapus/list, karena
+# isi catatan bebas ("ingat bahwa saya sering lupa") bisa memuat kata seperti
+# "lupa" atau "show". "ingat"/"remember" tanpa "bahwa"/"that" tidak termasuk
+# karena juga dipakai untuk bertanya ("ingat apa saja tentang aku?").
+_EXPLICIT_SAVE_RE = re.compile(
+    r'^\s*(?:ingat bahwa|remember that|simpan|save|catat|note)\s',
+    re.IGNORECASE,
+)
+
 
 class MemoryAgent(BaseAgent):
     """
@@ -40,10 +64,15 @@ class MemoryAgent(BaseAgent):
 
     async def run(self, ctx: AgentContext) -> AgentResult:
         """Handle memory operation dari task."""
-        task_lower = ctx.task.lower()
+        # ── Simpan memory (prefix eksplisit) ─────────────────────────────
+        if _EXPLICIT_SAVE_RE.match(ctx.task):
+            return await self._save(ctx)
+
+        tokens = _TOKEN_RE.findall(ctx.task.lower())
+        token_set = frozenset(tokens)
 
         # ── Hapus memory ──────────────────────────────────────────────────
-        if any(k in task_lower for k in ['hapus', 'forget', 'delete', 'clear', 'lupa', 'bersihkan']):
+        if token_set & _DELETE_WORDS:
             try:
                 count = await db.memory_delete(ctx.channel, ctx.channel_id)
                 return AgentResult(
@@ -60,7 +89,7 @@ class MemoryAgent(BaseAgent):
                 )
 
         # ── Tampilkan memory ──────────────────────────────────────────────
-        if any(k in task_lower for k in ['list', 'tampilkan', 'show', 'ingat apa', 'tau apa', 'apa yang']):
+        if token_set & _LIST_WORDS or not _LIST_PHRASES.isdisjoint(zip(tokens, tokens[1:])):
             try:
                 memories = await db.memory_get_context(ctx.channel, ctx.channel_id, limit=10)
                 if not memories:
@@ -87,15 +116,14 @@ class MemoryAgent(BaseAgent):
                 )
 
         # ── Simpan memory baru ────────────────────────────────────────────
-        # Ekstrak konten yang ingin disimpan dari task
+        return await self._save(ctx)
+
+    async def _save(self, ctx: AgentContext) -> AgentResult:
+        """Simpan isi task (tanpa prefix perintah) sebagai memory user_note."""
         content = ctx.task
-        for prefix in [
-            'ingat bahwa ', 'ingat ', 'remember that ', 'remember ',
-            'simpan ', 'save ', 'catat ', 'note ',
-        ]:
-            if task_lower.startswith(prefix):
-                content = ctx.task[len(prefix):].strip()
-                break
+        match = _SAVE_PREFIX_RE.match(ctx.task.lstrip())
+        if match:
+            content = match.group('content').strip()
 
         if not content:
             return AgentResult(
@@ -104,8 +132,10 @@ class MemoryAgent(BaseAgent):
                 agent_name=self.name,
             )
 
+        # Disimpan lewat antrian batch, tapi ditunggu sampai batch-nya benar-benar
+        # tersimpan: "Tersimpan" hanya dibalas jika memory user tidak hilang.
         try:
-            await db.memory_add(
+            await memory_writer.write(
                 channel=ctx.channel,
                 channel_id=ctx.channel_id,
                 content=content,
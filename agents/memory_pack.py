@@ -0,0 +1,55 @@
+"""
+agents/memory_pack.py — Seleksi memory yang relevan untuk prompt
+
+Alih-alih meng-inject semua memory terbaru ke prompt, ambil kandidat dari DB
+lalu pilih top-K yang paling relevan dengan task (overlap token kata).
+Urutan hasil deterministik (lama → baru) supaya prefix prompt stabil.
+"""
+
+from __future__ import annotations
+
+import re
+
+import db
+
+# Jumlah kandidat memory terbaru yang diambil dari DB sebelum diseleksi
+CANDIDATE_LIMIT = 20
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _tokens(text: str) -> frozenset[str]:
+    return frozenset(t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 2)
+
+
+def select_top_k(query: str, memories: list[db.MemoryRecord], k: int = 5) -> list[db.MemoryRecord]:
+    """
+    Pilih k memory paling relevan dengan query.
+
+    Skor = jumlah token yang sama dengan query; seri dipecah berdasarkan
+    urutan terbaru. Jika tidak ada yang relevan, hasilnya sama dengan
+    k memory terbaru. `memories` diasumsikan urut terbaru → terlama.
+    """
+    if len(memories) <= k:
+        return list(memories)
+    q = _tokens(query)
+    ranked = sorted(
+        enumerate(memories),
+        key=lambda im: (-len(q & _tokens(im[1].content)), im[0]),
+    )
+    # Kembalikan dalam urutan asli (terbaru → terlama)
+    return [m for _, m in sorted(ranked[:k], key=lambda im: im[0])]
+
+
+async def build_memory_pack(channel: str, channel_id: str, query: str, k: int = 5) -> str:
+    """
+    Format memory relevan sebagai string untuk di-inject ke agent prompt.
+    Format sama dengan db.memory_format_for_prompt().
+    """
+    memories = await db.memory_get_context(channel, channel_id, limit=max(k, CANDIDATE_LIMIT))
+    if not memories:
+        return ''
+    # dari yang lama ke baru
+    return db.MEMORY_HEADER + '\n'.join(
+        f'  [{m.mem_type}] {m.content}' for m in reversed(select_top_k(query, memories, k))
+    )
@@ -0,0 +1,118 @@
+"""
+agents/memory_writer.py — MemoryWriter
+
+Antrian tulis memory ke DB. Row dimasukkan ke asyncio.Queue dan di-flush
+oleh satu background task dalam batch (maks MAX_BATCH row atau setiap
+FLUSH_INTERVAL detik) memakai satu executemany per batch.
+
+put()   : fire-and-forget, untuk memory otomatis (task_result).
+write() : menunggu hasil batch-nya, untuk memory yang diminta user secara
+          eksplisit — jika batch gagal, error diteruskan ke pemanggil.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import db
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryWriter:
+    """Write-coalescing queue untuk db.memory_add_many()."""
+
+    FLUSH_INTERVAL = 0.05  # detik menunggu row tambahan sebelum flush
+    MAX_BATCH = 50
+
+    def __init__(self) -> None:
+        # Item antrian: (row, future atau None untuk put() fire-and-forget)
+        self._queue: asyncio.Queue[tuple[tuple, asyncio.Future | None]] | None = None
+        self._task: asyncio.Task | None = None
+
+    def put(
+        self,
+        channel: str,
+        channel_id: str,
+        content: str,
+        mem_type: str = 'general',
+        username: str | None = None,
+        task_id: str | None = None,
+        source: str | None = None,
+    ) -> None:
+        """Antrikan satu memory. Tidak menunggu DB; error hanya di-log."""
+        self._enqueue((channel, channel_id, username, content, mem_type, source, task_id), None)
+
+    async def write(
+        self,
+        channel: str,
+        channel_id: str,
+        content: str,
+        mem_type: str = 'general',
+        username: str | None = None,
+        task_id: str | None = None,
+        source: str | None = None,
+    ) -> None:
+        """Antrikan satu memory lalu tunggu batch-nya tersimpan. Raise jika gagal."""
+        fut = asyncio.get_running_loop().create_future()
+        self._enqueue((channel, channel_id, username, content, mem_type, source, task_id), fut)
+        await fut
+
+    def _enqueue(self, row: tuple, fut: asyncio.Future | None) -> None:
+        if self._queue is None or self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._flusher())
+        self._queue.put_nowait((row, fut))
+
+    async def close(self) -> None:
+        """Flush sisa antrian lalu hentikan background task."""
+        if self._queue is not None:
+            await self._queue.join()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._queue = None
+        self._task = None
+
+    async def _flusher(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.FLUSH_INTERVAL
+            while len(batch) < self.MAX_BATCH:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            saved = False
+            error: Exception | None = None
+            try:
+                await db.memory_add_many([row for row, _ in batch])
+                saved = True
+            except Exception as e:
+                error = e
+                logger.warning(f'Gagal simpan {len(batch)} memory: {e}')
+            finally:
+                # Beri tahu pemanggil write(); jika flusher dibatalkan, future ikut dibatalkan
+                for _, fut in batch:
+                    if fut is not None and not fut.done():
+                        if saved:
+                            fut.set_result(None)
+                        elif error is not None:
+                            fut.set_exception(error)
+                        else:
+                            fut.cancel()
+                    queue.task_done()
+
+
+# Instance global yang dipakai MemoryAgent & Supervisor
+memory_writer = MemoryWriter()
@@ -6,19 +6,34 @@ menyusunnya menjadi system prompt yang diinjeksikan ke semua agent.
 
 Fitur:
 - Singleton: cukup satu instance untuk seluruh proses
-- Cache: file hanya dibaca ulang jika mtime berubah (hot-reload tanpa restart)
+- Cache: file hanya dibaca ulang jika berubah (hot-reload tanpa restart).
+  Jika paket `watchdog` ter-install, perubahan dideteksi lewat event filesystem
+  (tanpa syscall di jalur normal); jika tidak, fallback ke polling mtime.
+- System prompt statis di-prebuild sekali per reload, hanya extra yang disambung
 - Graceful fallback: jika file tidak ada, gunakan default minimal
 - Parse nama pemilik dari identity.md untuk sapaan personal
 """
 
 from __future__ import annotations
 
+import asyncio
+import functools
 import logging
 import os
 import re
+import threading
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any
+
+try:
+    from watchdog.events import FileSystemEvent, FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
@@ -27,20 +42,45 @@ _DEFAULT_SOUL     = Path(__file__).parent.parent / 'soul.md'
 _DEFAULT_IDENTITY = Path(__file__).parent.parent / 'identity.md'
 
 
+# ─── Regex (dikompilasi sekali) ──────────────────────────────────────────────
+
+# Bagian "## Nilai ..." di soul.md: judul sampai akhir baris, lalu isi sampai heading berikutnya
+_NILAI_RE = re.compile(r'##\s*Nilai[^\n]*\n(.*?)(?=\n##|\Z)', re.DOTALL | re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=8)
+def _field_pattern(field_name: str) -> re.Pattern[str]:
+    # Match: **Nama:** nilai  atau  Nama: nilai (nilai sampai akhir baris)
+    return re.compile(rf'\*{{0,2}}{re.escape(field_name)}\*{{0,2}}\s*:\s*(.+)', re.IGNORECASE)
+
+
 # ─── PersonaData ─────────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class PersonaData:
     """Hasil parse dari soul.md + identity.md."""
-    soul_text: str       = ''   # isi lengkap soul.md
-    identity_text: str   = ''   # isi lengkap identity.md
+    soul_text: str       = ''   # isi lengkap soul.md (sudah di-strip)
+    identity_text: str   = ''   # isi lengkap identity.md (sudah di-strip)
     ai_name: str         = 'Aria'   # diambil dari soul.md baris "**Nama:**"
     owner_name: str      = ''   # diambil dari identity.md baris "**Nama:**"
     owner_callname: str  = ''   # diambil dari identity.md baris "**Panggilan:**"
     owner_lang: str      = 'Indonesia'  # bahasa utama pemilik
+    soul_guidelines: str = ''   # isi bagian "## Nilai" dari soul.md (maks 300 char)
     loaded_at: float     = field(default_factory=time.time)
 
 
+@dataclass(slots=True)
+class _PersonaState:
+    """
+    PersonaData + cache turunannya. Setiap reload membuat state baru dan
+    memasangnya dengan satu assignment, jadi cache yang diisi dari data
+    lama (mis. saat reload berjalan di worker thread) ikut terbuang.
+    """
+    data: PersonaData
+    static_prompt: str | None = None  # prebuilt build_system_prompt() tanpa extra
+    browser_instruction: str | None = None  # prebuilt build_browser_instruction()
+
+
 # ─── PersonaLoader ───────────────────────────────────────────────────────────
 
 class PersonaLoader:
@@ -48,10 +88,12 @@ class PersonaLoader:
     Singleton loader untuk soul.md dan identity.md.
 
     Gunakan PersonaLoader.get() untuk mendapatkan instance global.
-    Data di-cache dan di-reload otomatis jika file berubah (mtime check).
+    Data di-cache dan di-reload otomatis jika file berubah
+    (event watchdog, atau mtime check tiap RELOAD_INTERVAL sebagai fallback).
     """
 
     _instance: PersonaLoader | None = None
+    _instance_lock = threading.Lock()
 
     # Interval minimal antara mtime check (detik)
     RELOAD_INTERVAL = 60.0
@@ -64,33 +106,50 @@ class PersonaLoader:
         self._soul_path     = Path(soul_path)     if soul_path     else Path(os.environ.get('SOUL_FILE',     str(_DEFAULT_SOUL)))
         self._identity_path = Path(identity_path) if identity_path else Path(os.environ.get('IDENTITY_FILE', str(_DEFAULT_IDENTITY)))
 
-        self._data: PersonaData = PersonaData()
+        self._state = _PersonaState(PersonaData())
         self._soul_mtime: float = 0.0
         self._identity_mtime: float = 0.0
         self._last_check: float = 0.0
+        self._dirty = False         # diset oleh watcher saat file berubah
+        self._observer: Any = None  # watchdog Observer, None = mode polling
 
         # Load sekali saat inisialisasi
         self._reload()
+        self._start_watcher()
 
     # ── Singleton ──────────────────────────────────────────────────────────
 
     @classmethod
     def get(cls) -> 'PersonaLoader':
-        """Kembalikan instance singleton. Buat jika belum ada."""
-        if cls._instance is None:
-            cls._instance = cls()
-        return cls._instance
+        """
+        Kembalikan instance singleton. Buat jika belum ada.
+        Double-checked locking: aman dipanggil dari beberapa thread
+        (mis. refresh() via asyncio.to_thread), tanpa lock di jalur normal.
+        """
+        instance = cls._instance
+        if instance is None:
+            with cls._instance_lock:
+                instance = cls._instance
+                if instance is None:
+                    instance = cls._instance = cls()
+        return instance
 
     # ── Public API ─────────────────────────────────────────────────────────
 
     @property
     def data(self) -> PersonaData:
         """Kembalikan PersonaData, reload jika file berubah."""
-        now = time.monotonic()
-        if now - self._last_check >= self.RELOAD_INTERVAL:
-            self._last_check = now
-            self._check_and_reload()
-        return self._data
+        return self._current().data
+
+    async def refresh(self) -> None:
+        """
+        Cek perubahan file & reload di worker thread, agar I/O file
+        (FS lambat, antivirus, network drive) tidak memblokir event loop.
+        Panggil dari kode async sebelum memakai persona; akses `data`
+        berikutnya tidak perlu I/O lagi.
+        """
+        if self._refresh_due():
+            await asyncio.to_thread(self._refresh)
 
     @property
     def ai_name(self) -> str:
@@ -108,17 +167,33 @@ class PersonaLoader:
         """
         Susun system prompt lengkap: soul + identity + extra context.
 
+        Bagian statis (soul + identity + sapaan) di-cache sampai file
+        berubah; hanya extra yang disambung per panggilan.
+
         Returns:
             String siap pakai sebagai system message untuk LLM.
         """
-        d = self.data
+        state = self._current()  # memicu reload jika file berubah (state baru)
+        static_prompt = state.static_prompt
+        if static_prompt is None:
+            static_prompt = state.static_prompt = self._build_static_prompt(state.data)
+
+        # ── Extra context (memory, dll) ──────────────────────────────────
+        extra = extra.strip() if extra else ''
+        if extra:
+            return f'{static_prompt}\n\n---\n\n{extra}'
+        return static_prompt
+
+    @staticmethod
+    def _build_static_prompt(d: PersonaData) -> str:
+        """Bagian system prompt yang hanya bergantung pada PersonaData."""
         parts: list[str] = []
 
         # ── Karakter AI ──────────────────────────────────────────────────
         if d.soul_text:
             parts.append(
                 '## Karakter & Persona\n\n'
-                + d.soul_text.strip()
+                + d.soul_text
             )
         else:
             parts.append(
@@ -130,7 +205,7 @@ class PersonaLoader:
         if d.identity_text:
             parts.append(
                 '## Tentang Pemilik\n\n'
-                + d.identity_text.strip()
+                + d.identity_text
             )
         elif d.owner_name:
             parts.append(
@@ -146,10 +221,6 @@ class PersonaLoader:
                 f'Jangan gunakan panggilan lain kecuali diminta.'
             )
 
-        # ── Extra context (memory, dll) ──────────────────────────────────
-        if extra:
-            parts.append(extra.strip())
-
         return '\n\n---\n\n'.join(parts)
 
     def build_browser_instruction(self) -> str:
@@ -158,7 +229,11 @@ class PersonaLoader:
         Lebih ringkas dari build_system_prompt() karena browser agent
         punya system prompt sendiri yang panjang.
         """
-        d = self.data
+        state = self._current()  # memicu reload jika file berubah (state baru)
+        if state.browser_instruction is not None:
+            return state.browser_instruction
+        d = state.data
+
         lines: list[str] = []
 
         if d.ai_name and d.ai_name != 'Aria':
@@ -167,14 +242,9 @@ class PersonaLoader:
         if d.owner_callname:
             lines.append(f'You are working for {d.owner_callname}.')
 
-        if d.soul_text:
-            # Ambil hanya bagian Nilai & Batasan dari soul.md jika ada
-            match = re.search(
-                r'##\s*Nilai.*?\n(.*?)(?=\n##|\Z)',
-                d.soul_text, re.DOTALL | re.IGNORECASE
-            )
-            if match:
-                lines.append('Guidelines: ' + match.group(1).strip()[:300])
+        if d.soul_guidelines:
+            # Hanya bagian Nilai & Batasan dari soul.md (di-extract saat reload)
+            lines.append('Guidelines: ' + d.soul_guidelines)
 
         lines.append(
             'IMPORTANT: Whenever you take a screenshot, ALWAYS provide a '
@@ -182,14 +252,78 @@ class PersonaLoader:
             'image is saved to disk and can be sent back to the user.'
         )
 
-        return '\n'.join(lines)
+        state.browser_instruction = '\n'.join(lines)
+        return state.browser_instruction
 
     # ── Internal ──────────────────────────────────────────────────────────
 
+    def _current(self) -> _PersonaState:
+        """State terbaru (reload dulu jika file berubah). Dibaca sekali per pemakaian."""
+        if self._refresh_due():
+            self._refresh()
+        return self._state
+
+    def _refresh_due(self) -> bool:
+        """True jika file mungkin berubah dan perlu dicek/reload."""
+        if self._observer is not None:
+            return self._dirty
+        return time.monotonic() - self._last_check >= self.RELOAD_INTERVAL
+
+    def _refresh(self) -> None:
+        if self._observer is not None:
+            self._dirty = False
+            self._reload()
+        else:
+            self._last_check = time.monotonic()
+            self._check_and_reload()
+
+    def _start_watcher(self) -> None:
+        """Pasang watchdog observer di folder soul/identity jika tersedia."""
+        if not WATCHDOG_AVAILABLE:
+            return
+        watched = {str(self._soul_path.resolve()), str(self._identity_path.resolve())}
+        loader = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event: FileSystemEvent) -> None:
+                paths = {str(event.src_path), str(getattr(event, 'dest_path', '') or '')}
+                if any(os.path.abspath(p) in watched for p in paths if p):
+                    loader._dirty = True
+
+        try:
+            observer = Observer()
+            handler = _Handler()
+            for folder in {self._soul_path.resolve().parent, self._identity_path.resolve().parent}:
+                if folder.is_dir():
+                    observer.schedule(handler, str(folder), recursive=False)
+            observer.daemon = True
+            observer.start()
+            self._observer = observer
+            logger.debug('Persona watcher aktif (watchdog)')
+        except Exception as e:
+            logger.debug(f'Watchdog tidak bisa dipakai, fallback ke polling: {e}')
+
+    def _mtimes(self) -> tuple[float, float]:
+        """
+        mtime soul & identity. Jika keduanya satu folder, cukup satu
+        os.scandir() untuk kedua file; jika tidak, dua stat().
+        """
+        soul, identity = self._soul_path, self._identity_path
+        if soul.parent != identity.parent:
+            return self._mtime(soul), self._mtime(identity)
+        found: dict[str, float] = {}
+        try:
+            with os.scandir(soul.parent) as it:
+                for entry in it:
+                    if entry.name == soul.name or entry.name == identity.name:
+                        found[entry.name] = entry.stat().st_mtime
+        except OSError:
+            pass
+        return found.get(soul.name, 0.0), found.get(identity.name, 0.0)
+
     def _check_and_reload(self) -> None:
         """Reload file jika mtime berubah sejak terakhir load."""
-        soul_mtime     = self._mtime(self._soul_path)
-        identity_mtime = self._mtime(self._identity_path)
+        soul_mtime, identity_mtime = self._mtimes()
 
         if soul_mtime != self._soul_mtime or identity_mtime != self._identity_mtime:
             self._reload()
@@ -199,29 +333,51 @@ class PersonaLoader:
         soul_text     = self._read(self._soul_path)
         identity_text = self._read(self._identity_path)
 
-        self._data = PersonaData(
+        soul_fields     = self._parse_fields(soul_text, ('Nama',))
+        identity_fields = self._parse_fields(identity_text, ('Nama', 'Panggilan', 'Bahasa utama'))
+
+        data = PersonaData(
             soul_text=soul_text,
             identity_text=identity_text,
-            ai_name=self._parse_field(soul_text, 'Nama') or 'Aria',
-            owner_name=self._parse_field(identity_text, 'Nama') or '',
-            owner_callname=self._parse_field(identity_text, 'Panggilan') or '',
-            owner_lang=self._parse_field(identity_text, 'Bahasa utama') or 'Indonesia',
+            ai_name=soul_fields['Nama'] or 'Aria',
+            owner_name=identity_fields['Nama'] or '',
+            owner_callname=identity_fields['Panggilan'] or '',
+            owner_lang=identity_fields['Bahasa utama'] or 'Indonesia',
+            soul_guidelines=self._extract_guidelines(soul_text),
         )
+        # Data & cache kosong dipasang bersamaan (satu assignment)
+        self._state = _PersonaState(data)
 
-        self._soul_mtime     = self._mtime(self._soul_path)
-        self._identity_mtime = self._mtime(self._identity_path)
-        self._last_check     = time.monotonic()
+        self._soul_mtime, self._identity_mtime = self._mtimes()
+        self._last_check = time.monotonic()
 
         logger.info(
-            f'Persona loaded — AI: {self._data.ai_name!r}, '
-            f'Owner: {self._data.owner_callname or self._data.owner_name or "(unknown)"!r}'
+            f'Persona loaded — AI: {data.ai_name!r}, '
+            f'Owner: {data.owner_callname or data.owner_name or "(unknown)"!r}'
         )
 
+    @staticmethod
+    def _extract_guidelines(soul_text: str) -> str:
+        """Ambil isi bagian "## Nilai" dari soul.md, '' jika tidak ada."""
+        # Pre-check murah: tanpa heading sama sekali, regex tidak perlu jalan
+        if '##' not in soul_text:
+            return ''
+        match = _NILAI_RE.search(soul_text)
+        return match.group(1).strip()[:300] if match else ''
+
     @staticmethod
     def _read(path: Path) -> str:
-        """Baca file, kembalikan string kosong jika tidak ada."""
+        """
+        Baca file dalam bentuk kanonik: line ending '\n' dan sudah di-strip,
+        sehingga kode setelahnya tidak perlu normalisasi/strip lagi.
+        Kembalikan string kosong jika tidak ada.
+        """
         try:
-            return path.read_text(encoding='utf-8')
+            with open(path, 'rb') as f:
+                text = f.read().decode('utf-8', 'replace')
+            if '\r' in text:
+                text = text.replace('\r\n', '\n').replace('\r', '\n')
+            return text.strip()
         except FileNotFoundError:
             logger.debug(f'Persona file tidak ditemukan: {path}')
             return ''
@@ -238,21 +394,21 @@ class PersonaLoader:
             return 0.0
 
     @staticmethod
-    def _parse_field(text: str, field_name: str) -> str:
+    def _parse_fields(text: str, field_names: tuple[str, ...]) -> dict[str, str]:
         """
-        Parse nilai dari baris format: **Nama:** nilai
-        Mendukung variasi: '**Nama:**', 'Nama:', '- Nama:' dll.
+        Parse beberapa field dari baris format: **Nama:** nilai
+        Label dicari di mana saja dalam teks (tidak harus di awal baris), jadi
+        variasi seperti 'Nama:', '- Nama:', '### Nama: X', '1. **Nama:** X' dan
+        baris tabel '| **Nama:** | X |' semuanya dikenali.
+
+        Field yang tidak ditemukan bernilai ''. Kemunculan pertama menang.
         """
-        # Match: **Nama:** nilai  atau  Nama: nilai
-        pattern = rf'\*{{0,2}}{re.escape(field_name)}\*{{0,2}}\s*:\s*(.+)'
-        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-        if match:
-            # Ambil teks sampai akhir baris, strip markdown formatting
-            raw = match.group(1).strip()
-            raw = re.sub(r'\*+', '', raw)   # hapus bold/italic markers
-            raw = raw.split('(')[0].strip() # buang komentar dalam kurung
-            return raw
-        return ''
+        found: dict[str, str] = {}
+        for name in field_names:
+            match = _field_pattern(name).search(text)
+            # Strip markdown formatting & pemisah tabel, buang komentar dalam kurung
+            found[name] = match.group(1).replace('*', '').partition('(')[0].strip(' \t|') if match else ''
+        return found
 
 
 # ─── Module-level singleton helper ───────────────────────────────────────────
@@ -0,0 +1,94 @@
+"""
+agents/routing_cache.py — Cache keputusan routing Supervisor
+
+Task yang sama (setelah normalisasi: huruf kecil, tanda baca & spasi
+berlebih dibuang) selalu dirutekan ke agent yang sama, karena router
+dipanggil dengan temperature=0. Cache ini menghindari satu round-trip
+LLM untuk task berulang seperti "buka google" atau "ambil screenshot".
+
+Kunci cache adalah hash blake2b 8-byte dari task ternormalisasi, jadi
+task panjang tidak ikut disimpan di memori. Entry kedaluwarsa setelah
+TTL detik.
+
+keyword_route() menangani pola yang jelas (mis. "buka https://...")
+tanpa LLM sama sekali.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from collections import OrderedDict
+
+_NON_WORD_RE = re.compile(r'[^\w]+')
+
+# "buka/open/kunjungi/browse <url atau domain>" → browser
+_BROWSER_CMD_RE = re.compile(
+    r'^\s*(?:buka|bukakan|open|kunjungi|browse|go to|pergi ke)\s+'
+    r'(?:https?://|www\.|[\w-]+\.(?:com|net|org|id|co\.id|io|dev|ai)\b)',
+    re.IGNORECASE,
+)
+# "ingat bahwa ..." / "remember that ..." → memory (simpan)
+_MEMORY_SAVE_RE = re.compile(r'^\s*(?:ingat bahwa|remember that)\s+\S', re.IGNORECASE)
+
+
+def normalize_task(task: str) -> str:
+    """Normalisasi teks task menjadi kunci cache."""
+    return _NON_WORD_RE.sub(' ', task.lower()).strip()
+
+
+def task_key(task: str) -> str:
+    """Hash pendek dari task ternormalisasi. String kosong jika task kosong."""
+    norm = normalize_task(task)
+    if not norm:
+        return ''
+    return hashlib.blake2b(norm.encode(), digest_size=8).hexdigest()
+
+
+def keyword_route(task: str) -> str | None:
+    """
+    Routing tanpa LLM untuk pola yang hampir pasti.
+    Return nama agent, atau None jika harus ditanyakan ke router LLM.
+    """
+    if _BROWSER_CMD_RE.match(task):
+        return 'browser'
+    if _MEMORY_SAVE_RE.match(task):
+        return 'memory'
+    return None
+
+
+class RoutingCache:
+    """LRU cache dengan TTL: hash task ternormalisasi → nama agent."""
+
+    def __init__(self, max_size: int = 512, ttl: float = 300.0) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    def get(self, task: str) -> str | None:
+        key = task_key(task)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        agent_name, ts = entry
+        if time.monotonic() - ts >= self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return agent_name
+
+    def put(self, task: str, agent_name: str) -> None:
+        key = task_key(task)
+        if not key:
+            return
+        self._entries[key] = (agent_name, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -17,7 +17,7 @@ Flow lengkap:
         → LLM routing: pilih agent
         → on_update("Routing ke agent X...")
         → Agent.run(ctx)
-        → [DB] task_done, step_log, attachment_save, memory_add
+        → [DB] task_done, step_log, attachment_save_many, memory_add
         → SupervisorResult (gabungan semua AgentResult)
     → Channel kirim hasil ke user
 """
@@ -29,24 +29,34 @@ import json
 import logging
 import os
 import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any
-
-from openai import AsyncOpenAI
+from typing import Any, Awaitable
 
 import db
 from agents.base import AgentContext, AgentResult, BaseAgent, BrowserConfig
 from agents.browser import BrowserAgent
 from agents.chat import ChatAgent
+from agents.llm_client import close_http_client, get_openai_client
 from agents.memory import MemoryAgent
+from agents.memory_pack import build_memory_pack
+from agents.memory_writer import memory_writer
 from agents.persona import get_persona
+from agents.routing_cache import RoutingCache, keyword_route
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads  # parser C, terima str maupun bytes
+except ImportError:
+    _json_loads = json.loads
 
 logger = logging.getLogger(__name__)
 
 
 # ─── SupervisorResult ─────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class SupervisorResult:
     """Hasil akhir yang dikembalikan ke channel."""
     success: bool
@@ -54,25 +64,33 @@ class SupervisorResult:
     agent_used: str                          # nama agent yang dipakai
     steps: int = 0
     attachments: list[str] = field(default_factory=list)
-    errors: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)  # tanpa string kosong (difilter di run())
 
     def format(self) -> str:
         status = 'Selesai' if self.success else 'Gagal'
-        lines = [
-            f'Status: {status}',
-            f'Agent: {self.agent_used}',
-            f'Langkah: {self.steps}',
-            '',
-            'Hasil:',
-            self.output,
-        ]
-        if self.errors and any(e for e in self.errors if e):
-            lines += ['', 'Error:', *[f'- {e}' for e in self.errors if e]]
-        return '\n'.join(lines)
+        text = (
+            f'Status: {status}\n'
+            f'Agent: {self.agent_used}\n'
+            f'Langkah: {self.steps}\n'
+            f'\n'
+            f'Hasil:\n'
+            f'{self.output}'
+        )
+        if self.errors:
+            text += '\n\nError:\n' + '\n'.join(f'- {e}' for e in self.errors)
+        return text
 
 
 # ─── Supervisor ───────────────────────────────────────────────────────────────
 
+_IMAGE_EXTS = frozenset({'.png', '.jpg', '.jpeg', '.webp'})
+_MIME_BY_EXT = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.webp': 'image/webp',
+}
+
 ROUTER_SYSTEM = """You are the task router for {ai_name}, a multi-agent AI assistant.
 Your job is to select the BEST agent for the user's task.
 
@@ -96,8 +114,8 @@ class Supervisor:
     LLM Orchestrator yang mengelola semua agent dan routing task.
 
     Dapat diinstansiasi sekali dan digunakan oleh semua channel.
-    Thread-safe: menggunakan asyncio.Lock() per eksekusi browser agar
-    tidak ada dua browser berjalan bersamaan.
+    Konkurensi browser diatur oleh BrowserAgent sendiri: bergantian jika
+    session di-reuse, paralel (maks BrowserConfig.max_concurrency) jika tidak.
 
     Conversation history disimpan in-memory per (channel, channel_id),
     capped di MAX_HISTORY_MESSAGES pesan. Gunakan clear_history() untuk reset.
@@ -108,15 +126,20 @@ class Supervisor:
     def __init__(self, llm: Any, config: BrowserConfig | None = None):
         self.llm = llm
         self.config = config or BrowserConfig()
-        self._browser_lock = asyncio.Lock()
-        self._client = AsyncOpenAI(
-            api_key=os.environ.get('OPENAI_API_KEY', ''),
-            base_url=os.environ.get('OPENAI_BASE_URL', 'https://api.openai.com/v1'),
-        )
+        self._client = get_openai_client()
         self._model = os.environ.get('OPENAI_MODEL', 'gpt-4o')
 
-        # Conversation history: {f"{channel}:{channel_id}": [msg, ...]}
-        self._histories: dict[str, list[dict]] = {}
+        # Conversation history: {f"{channel}:{channel_id}": deque([msg, ...])}
+        # deque(maxlen) membuang pesan terlama otomatis dalam O(1)
+        self._histories: dict[str, deque[dict]] = {}
+        # Snapshot tuple per sesi, di-reuse sampai history berubah
+        self._history_snapshots: dict[str, tuple[dict, ...]] = {}
+
+        # Cache keputusan routing untuk task berulang
+        self._route_cache = RoutingCache()
+
+        # Write DB non-kritis yang berjalan di background (lihat _spawn_write)
+        self._bg_tasks: set[asyncio.Task] = set()
 
         # Registry agen — mudah ditambah/dihapus
         self._agents: dict[str, BaseAgent] = {
@@ -125,48 +148,102 @@ class Supervisor:
             'memory': MemoryAgent(llm=self.llm),
         }
 
+        # System prompt router: dibangun saat registry berubah, bukan per task
+        self._router_system = ''
+        self._router_ai_name: str | None = None
+        self._rebuild_router_system()
+
     def register_agent(self, agent: BaseAgent) -> None:
         """Tambahkan agent baru ke registry. Plug & play."""
         self._agents[agent.name] = agent
+        self._route_cache.clear()  # keputusan lama mungkin tidak optimal lagi
+        self._rebuild_router_system()
         logger.info(f'Agent registered: {agent.name}')
 
+    def _rebuild_router_system(self) -> None:
+        """Format ulang ROUTER_SYSTEM dari registry agent + nama AI saat ini."""
+        descriptions = '\n'.join(
+            f'- {name}: {agent.description}'
+            for name, agent in self._agents.items()
+        )
+        self._router_ai_name = get_persona().ai_name
+        self._router_system = ROUTER_SYSTEM.format(
+            ai_name=self._router_ai_name,
+            agent_descriptions=descriptions,
+        )
+
+    def _get_router_system(self) -> str:
+        """System prompt router; dibangun ulang hanya jika nama AI berubah (reload persona)."""
+        if get_persona().ai_name != self._router_ai_name:
+            self._rebuild_router_system()
+        return self._router_system
+
+    async def close(self) -> None:
+        """Tutup resource semua agent (misal browser persisten) dan flush write DB yang tertunda."""
+        if self._bg_tasks:
+            await asyncio.gather(*self._bg_tasks, return_exceptions=True)
+        await memory_writer.close()
+        for agent in self._agents.values():
+            try:
+                await agent.close()
+            except Exception as e:
+                logger.debug(f'Gagal close agent {agent.name}: {e}')
+        await close_http_client()
+
     def clear_history(self, channel: str, channel_id: str) -> int:
         """Hapus conversation history untuk satu sesi. Return jumlah pesan yang dihapus."""
         key = f'{channel}:{channel_id}'
-        hist = self._histories.pop(key, [])
+        self._history_snapshots.pop(key, None)
+        hist = self._histories.pop(key, ())
         logger.info(f'History cleared for {key}: {len(hist)} messages removed')
         return len(hist)
 
-    def _get_history(self, channel: str, channel_id: str) -> list[dict]:
+    def _get_history(self, channel: str, channel_id: str) -> deque[dict]:
         """Ambil history untuk satu sesi (buat jika belum ada)."""
-        return self._histories.setdefault(f'{channel}:{channel_id}', [])
+        key = f'{channel}:{channel_id}'
+        hist = self._histories.get(key)
+        if hist is None:
+            hist = self._histories[key] = deque(maxlen=self.MAX_HISTORY_MESSAGES)
+        return hist
+
+    def _history_snapshot(self, channel: str, channel_id: str) -> tuple[dict, ...]:
+        """Snapshot read-only history; dibuat ulang hanya setelah history berubah."""
+        key = f'{channel}:{channel_id}'
+        snap = self._history_snapshots.get(key)
+        if snap is None:
+            snap = self._history_snapshots[key] = tuple(self._histories.get(key, ()))
+        return snap
 
     def _append_history(self, channel: str, channel_id: str, user_msg: str, assistant_msg: str) -> None:
         """Tambahkan turn ke history, buang yang paling lama jika melebihi cap."""
+        self._history_snapshots.pop(f'{channel}:{channel_id}', None)
         hist = self._get_history(channel, channel_id)
         hist.append({'role': 'user', 'content': user_msg})
         hist.append({'role': 'assistant', 'content': assistant_msg})
-        # Potong dari depan jika melebihi batas
-        if len(hist) > self.MAX_HISTORY_MESSAGES:
-            excess = len(hist) - self.MAX_HISTORY_MESSAGES
-            del hist[:excess]
 
     # ─── Routing ──────────────────────────────────────────────────────────
 
-    async def _route(self, task: str) -> str:
+    async def _route(self, task: str) -> tuple[str, BaseAgent]:
         """
         Tanya LLM agent mana yang paling tepat untuk task ini.
-        Fallback ke 'chat' jika routing gagal.
+        Return (nama agent, instance agent).
+        Pola yang jelas dirutekan tanpa LLM; keputusan LLM di-cache per
+        task ternormalisasi (dengan TTL).
+        Fallback ke 'chat' jika routing gagal (fallback tidak di-cache).
         """
-        descriptions = '\n'.join(
-            f'- {name}: {agent.description}'
-            for name, agent in self._agents.items()
-        )
-        ai_name = get_persona().ai_name
-        system = ROUTER_SYSTEM.format(
-            ai_name=ai_name,
-            agent_descriptions=descriptions,
-        )
+        keyword = keyword_route(task)
+        agent = self._agents.get(keyword) if keyword is not None else None
+        if agent is not None:
+            logger.info(f'Routing → {keyword} (keyword)')
+            return keyword, agent
+
+        cached = self._route_cache.get(task)
+        agent = self._agents.get(cached) if cached is not None else None
+        if agent is not None:
+            logger.info(f'Routing → {cached} (cache)')
+            return cached, agent
+
+        system = self._get_router_system()
 
         try:
             resp = await self._client.chat.completions.create(
@@ -180,57 +257,81 @@ class Supervisor:
                 response_format={'type': 'json_object'},
             )
             raw = resp.choices[0].message.content or '{}'
-            data = json.loads(raw)
+            data = _json_loads(raw)
             agent_name = data.get('agent', 'chat')
             reason = data.get('reason', '')
-            if agent_name not in self._agents:
+            agent = self._agents.get(agent_name)
+            if agent is None:
                 logger.warning(f'Router returned unknown agent "{agent_name}", fallback to chat')
-                agent_name = 'chat'
+                return 'chat', self._agents['chat']
             logger.info(f'Routing → {agent_name}: {reason}')
-            return agent_name
+            self._route_cache.put(task, agent_name)
+            return agent_name, agent
         except Exception as e:
             logger.warning(f'Router error (fallback to chat): {e}')
-            return 'chat'
+            return 'chat', self._agents['chat']
 
-    # ─── Main run ─────────────────────────────────────────────────────────
+    def _spawn_write(self, label: str, coro: Awaitable[Any]) -> None:
+        """Jalankan write DB non-kritis di background; error hanya di-log."""
+        async def _safe() -> None:
+            try:
+                await coro
+            except Exception as e:
+                logger.debug(f'DB {label} gagal: {e}')
 
-    async def run(self, ctx: AgentContext) -> SupervisorResult:
+        t = asyncio.create_task(_safe())
+        self._bg_tasks.add(t)
+        t.add_done_callback(self._bg_tasks.discard)
+
+    @staticmethod
+    def _probe_attachment(path: str) -> dict[str, Any]:
+        """Metadata attachment untuk db.attachment_save_many (satu stat() per file)."""
+        try:
+            size: int | None = os.stat(path).st_size
+        except OSError:
+            size = None  # file tidak ada
+        ext = os.path.splitext(path)[1].lower()
+        return {
+            'file_name': os.path.basename(path),
+            'file_path': path,
+            'file_type': 'screenshot' if ext in _IMAGE_EXTS else 'file',
+            'mime_type': _MIME_BY_EXT.get(ext),
+            'size_bytes': size,
+        }
+
+    @classmethod
+    async def _save_task_outputs(cls, task_id: str, agent_name: str, result: AgentResult) -> None:
         """
-        Jalankan task end-to-end:
-        1. Fetch memory context dari DB
-        2. Route ke agent yang tepat
-        3. Eksekusi agent
-        4. Simpan hasil ke DB
-        5. Return SupervisorResult
+        Simpan step summary + attachments satu task dalam satu acquire pool,
+        bukan satu acquire per write. stat() file dijalankan sebelum acquire
+        supaya koneksi tidak tertahan, dan kedua write gagal secara terpisah.
         """
-        start_ts = time.time()
+        infos: list[dict[str, Any]] = []
+        if result.attachments:
+            # stat() semua file di satu worker thread, bukan di event loop
+            infos = await asyncio.to_thread(lambda: [cls._probe_attachment(p) for p in result.attachments])
 
-        # ── 1. Fetch memory context ────────────────────────────────────
-        if not ctx.memory_context:
+        async with db.db() as conn:
             try:
-                ctx.memory_context = await db.memory_format_for_prompt(
-                    ctx.channel, ctx.channel_id, limit=5
-                ) or None
+                await db.step_log(
+                    task_id=task_id,
+                    step_num=1,
+                    actions=[agent_name],
+                    next_goal='',
+                    evaluation='done' if result.success else 'failed',
+                    url='',
+                    conn=conn,
+                )
             except Exception as e:
-                logger.debug(f'Gagal fetch memory: {e}')
-
-        # ── 1b. Inject conversation history ───────────────────────────
-        if not ctx.history:
-            ctx.history = list(self._get_history(ctx.channel, ctx.channel_id))
-
-        # ── 2. Create DB task record ───────────────────────────────────
-        task_id: str | None = None
-        try:
-            task_id = await db.task_create(
-                channel=ctx.channel,
-                channel_id=ctx.channel_id,
-                prompt=ctx.task,
-                username=ctx.username,
-            )
-            ctx.task_id = task_id
-        except Exception as e:
-            logger.warning(f'DB task_create gagal: {e}')
+                logger.debug(f'DB step_log gagal: {e}')
+            if infos:
+                try:
+                    await db.attachment_save_many(task_id, infos, conn=conn)
+                except Exception as e:
+                    logger.debug(f'DB attachment_save_many gagal ({len(infos)} file): {e}')
 
+    async def _execute(self, ctx: AgentContext, task_id: str | None) -> tuple[str, AgentResult]:
+        """Route task ke agent lalu jalankan. Return (nama agent, hasil)."""
         # ── 3. Route ───────────────────────────────────────────────────
         if ctx.on_update:
             try:
@@ -238,8 +339,7 @@ class Supervisor:
             except Exception:
                 pass
 
-        agent_name = await self._route(ctx.task)
-        agent = self._agents[agent_name]
+        agent_name, agent = await self._route(ctx.task)
 
         if ctx.on_update:
             try:
@@ -251,26 +351,96 @@ class Supervisor:
                 pass
 
         # ── 4. Execute agent ───────────────────────────────────────────
-        # Browser agent butuh lock agar hanya satu instance jalan
-        if agent_name == 'browser':
-            async with self._browser_lock:
-                if task_id:
-                    try:
-                        await db.task_start(task_id)
-                    except Exception:
-                        pass
-                result: AgentResult = await agent.run(ctx)
+        if task_id:
+            # Status RUNNING hanya informatif → tidak perlu ditunggu agent
+            self._spawn_write('task_start', db.task_start(task_id))
+        result = await agent.run(ctx)
+        return agent_name, result
+
+    # ─── Main run ─────────────────────────────────────────────────────────
+
+    async def run(self, ctx: AgentContext) -> SupervisorResult:
+        """
+        Jalankan task end-to-end:
+        1. Fetch memory context dari DB (top-K relevan dengan task)
+        2. Route ke agent yang tepat
+        3. Eksekusi agent
+        4. Simpan hasil ke DB
+        5. Return SupervisorResult
+        """
+        start_ts = time.time()
+
+        # Reload persona (jika berubah) di thread, bukan di event loop
+        try:
+            await get_persona().refresh()
+        except Exception as e:
+            logger.debug(f'Gagal refresh persona: {e}')
+
+        # ── 1-2. Fetch memory context & create DB task record ─────────
+        # Keduanya independen → dijalankan bersamaan (satu RTT, bukan dua)
+        async def _fetch_memory() -> None:
+            try:
+                ctx.memory_context = await build_memory_pack(
+                    ctx.channel, ctx.channel_id, ctx.task, k=5
+                ) or None
+            except Exception as e:
+                logger.debug(f'Gagal fetch memory: {e}')
+
+        async def _create_task() -> str | None:
+            try:
+                return await db.task_create(
+                    channel=ctx.channel,
+                    channel_id=ctx.channel_id,
+                    prompt=ctx.task,
+                    username=ctx.username,
+                )
+            except Exception as e:
+                logger.warning(f'DB task_create gagal: {e}')
+                return None
+
+        if ctx.memory_context:
+            task_id = await _create_task()
         else:
+            _, task_id = await asyncio.gather(_fetch_memory(), _create_task())
+        if task_id:
+            ctx.task_id = task_id
+
+        # ── 2b. Inject conversation history ───────────────────────────
+        if not ctx.history:
+            ctx.history = self._history_snapshot(ctx.channel, ctx.channel_id)
+
+        # ── 3-4. Route & execute ──────────────────────────────────────
+        # Channel membatalkan task dengan meng-cancel asyncio.Task pemanggil
+        # run() (mis. /cancel di Telegram); status CANCELLED dicatat di sini.
+        try:
+            agent_name, result = await self._execute(ctx, task_id)
+        except asyncio.CancelledError:
             if task_id:
-                try:
-                    await db.task_start(task_id)
-                except Exception:
-                    pass
-            result = await agent.run(ctx)
+                self._spawn_write('task_cancel', db.task_cancel(task_id))
+            raise
 
         duration_ms = int((time.time() - start_ts) * 1000)
 
         # ── 5. Simpan ke DB ────────────────────────────────────────────
+        # Hanya task_done yang ditunggu (status task harus konsisten);
+        # write lain berjalan di background agar tidak menambah latensi user.
+        if task_id:
+            # Log step summary + simpan attachments (satu koneksi)
+            self._spawn_write('step_log', self._save_task_outputs(task_id, agent_name, result))
+
+        # Auto-save hasil ke memory jika sukses & ada output bermakna
+        if result.success and result.output and len(result.output) > 20:
+            summary = result.output[:400]
+            memory_writer.put(
+                channel=ctx.channel,
+                channel_id=ctx.channel_id,
+                content=f'Task: {ctx.task[:100]}\nHasil: {summary}',
+                mem_type='task_result',
+                username=ctx.username,
+                task_id=task_id,
+                source=agent_name,
+            )
+
         if task_id:
             try:
                 await db.task_done(
@@ -283,54 +453,6 @@ class Supervisor:
             except Exception as e:
                 logger.warning(f'DB task_done gagal: {e}')
 
-            # Log step summary
-            try:
-                await db.step_log(
-                    task_id=task_id,
-                    step_num=1,
-                    actions=[agent_name],
-                    next_goal='',
-                    evaluation='done' if result.success else 'failed',
-                    url='',
-                )
-            except Exception:
-                pass
-
-            # Simpan attachments
-            for path in result.attachments:
-                try:
-                    from pathlib import Path
-                    p = Path(path)
-                    ext = p.suffix.lower()
-                    ftype = 'screenshot' if ext in ('.png', '.jpg', '.jpeg', '.webp') else 'file'
-                    mime = 'image/png' if ext == '.png' else ('image/jpeg' if ext in ('.jpg', '.jpeg') else None)
-                    await db.attachment_save(
-                        task_id=task_id,
-                        file_name=p.name,
-                        file_path=path,
-                        file_type=ftype,
-                        mime_type=mime,
-                        size_bytes=p.stat().st_size if p.exists() else None,
-                    )
-                except Exception:
-                    pass
-
-        # Auto-save hasil ke memory jika sukses & ada output bermakna
-        if result.success and result.output and len(result.output) > 20:
-            try:
-                summary = result.output[:400]
-                await db.memory_add(
-                    channel=ctx.channel,
-                    channel_id=ctx.channel_id,
-                    content=f'Task: {ctx.task[:100]}\nHasil: {summary}',
-                    mem_type='task_result',
-                    username=ctx.username,
-                    task_id=task_id,
-                    source=agent_name,
-                )
-            except Exception as e:
-                logger.debug(f'Auto-memory save gagal: {e}')
-
         # ── 6. Update conversation history ─────────────────────────────
         if result.output:
             try:
@@ -348,5 +470,5 @@ class Supervisor:
             agent_used=agent_name,
             steps=result.steps,
             attachments=result.attachments,
-            errors=result.errors,
+            errors=[e for e in result.errors if e],
         )
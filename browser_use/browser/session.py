@@ -3584,7 +3584,7 @@ class BrowserSession(BaseModel):
 			path: Optional file path to save screenshot
 			full_page: Capture entire scrollable page beyond viewport
 			format: Image format ('png', 'jpeg', 'webp')
-			quality: Quality 0-100 for JPEG format
+			quality: Quality 0-100 for JPEG/WebP format
 			clip: Region to capture {'x': int, 'y': int, 'width': int, 'height': int}
 
 		Returns:
@@ -3602,7 +3602,7 @@ class BrowserSession(BaseModel):
 			'captureBeyondViewport': full_page,
 		}
 
-		if quality is not None and format == 'jpeg':
+		if quality is not None and format in ('jpeg', 'webp'):
 			params['quality'] = quality
 
 		if clip:
@@ -3624,7 +3624,7 @@ class BrowserSession(BaseModel):
 		screenshot_data = base64.b64decode(result['data'])
 
 		if path:
-			Path(path).write_bytes(screenshot_data)
+			await asyncio.to_thread(Path(path).write_bytes, screenshot_data)
 
 		return screenshot_data
 
@@ -3641,7 +3641,7 @@ class BrowserSession(BaseModel):
 			selector: CSS selector for the element
 			path: Optional file path to save screenshot
 			format: Image format ('png', 'jpeg', 'webp')
-			quality: Quality 0-100 for JPEG format
+			quality: Quality 0-100 for JPEG/WebP format
 
 		Returns:
 			Screenshot data as bytes
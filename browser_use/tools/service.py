@@ -1393,13 +1393,20 @@ You will be given a query and the markdown of a webpage that has been filtered t
 			if params.file_name:
 				# Save screenshot to file
 				file_name = params.file_name
-				if not file_name.lower().endswith('.png'):
+				# JPEG/WebP are much smaller over the CDP websocket; honour them when explicitly requested
+				ext = os.path.splitext(file_name)[1].lower()
+				image_format = {'.jpg': 'jpeg', '.jpeg': 'jpeg', '.webp': 'webp'}.get(ext)
+				if image_format is None and ext != '.png':
 					file_name = f'{file_name}.png'
 				file_name = FileSystem.sanitize_filename(file_name)
 
-				screenshot_bytes = await browser_session.take_screenshot(full_page=False)
+				if image_format is not None:
+					screenshot_bytes = await browser_session.take_screenshot(full_page=False, format=image_format, quality=75)
+				else:
+					screenshot_bytes = await browser_session.take_screenshot(full_page=False)
 				file_path = file_system.get_dir() / file_name
-				file_path.write_bytes(screenshot_bytes)
+				# Write off the event loop: full-viewport PNGs can be several MB
+				await anyio.Path(file_path).write_bytes(screenshot_bytes)
 
 				result = f'Screenshot saved to {file_name}'
 				logger.info(f'📸 {result}. Full path: {file_path}')
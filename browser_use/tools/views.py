@@ -137,7 +137,7 @@ class ScreenshotAction(BaseModel):
 
 	file_name: str | None = Field(
 		default=None,
-		description='If provided, saves screenshot to this file and returns path. Otherwise screenshot is included in next observation.',
+		description='If provided, saves screenshot to this file and returns path (.png by default, .jpg or .webp for a smaller lossy image). Otherwise screenshot is included in next observation.',
 	)
 
 
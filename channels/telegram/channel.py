@@ -4,7 +4,7 @@ channels/telegram/channel.py — Telegram Channel
 Fitur:
 - Kirim pesan bebas (tanpa /task prefix) → langsung ke Supervisor
 - Live status update via edit-in-place saat agent bekerja
-- Animasi typing loop
+- Animasi typing (satu ticker untuk semua chat aktif)
 - Inline keyboard quick actions
 - Whitelist user_id untuk keamanan
 - Cancel task yang sedang berjalan
@@ -18,6 +18,11 @@ Setup:
 3. Tambahkan ke .env:
    TELEGRAM_BOT_TOKEN=your_token_here
    TELEGRAM_ALLOWED_USERS=123456789,987654321  # kosong = semua diizinkan
+4. (Opsional) Mode webhook, bukan long polling — butuh URL HTTPS publik
+   yang diteruskan ke host:port ini:
+   TELEGRAM_WEBHOOK_URL=https://bot.example.com/telegram
+   TELEGRAM_WEBHOOK_PORT=8443
+   TELEGRAM_WEBHOOK_SECRET=random_string  # dicek di header setiap update
 
 Perintah:
   /start    → menu utama
@@ -33,24 +38,104 @@ Perintah:
 from __future__ import annotations
 
 import asyncio
+import functools
+import html
 import json
 import logging
+import re
 import time
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable, Callable, Iterator
+from urllib.parse import urlsplit
 
 import aiohttp
+from aiohttp import web
 
 import db
 from agents.persona import get_persona
 from agents.supervisor import Supervisor, SupervisorResult
 from channels.base import BaseChannel
 
+try:
+    import orjson
+
+    # Encoder/decoder C untuk semua request/response Bot API (loads terima bytes)
+    _json_loads = orjson.loads
+    _json_body = orjson.dumps  # body request siap kirim (bytes)
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+    def _json_body(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode()
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
 logger = logging.getLogger(__name__)
 
 TELEGRAM_API = 'https://api.telegram.org/bot{token}/{method}'
 
+# Jarak minimal antar edit pesan progress (detik)
+PROGRESS_EDIT_INTERVAL = 2.0
+
+# Retry request Bot API: 429 → tunggu retry_after (maks RETRY_AFTER_MAX detik),
+# 5xx → backoff singkat (0.5s, 1s)
+MAX_API_RETRIES = 2
+RETRY_AFTER_MAX = 30.0
+# 5xx hanya di-retry untuk method idempoten: 5xx setelah timeout bisa berarti
+# pesan sudah terkirim, jadi sendMessage/sendPhoto yang diulang bisa dobel
+IDEMPOTENT_METHODS = frozenset({
+    'editMessageText', 'sendChatAction', 'getUpdates', 'getMe', 'setWebhook', 'deleteWebhook',
+})
+
+# Batas kirim Telegram: ~30 pesan/detik global dan ~1 pesan/detik per chat
+# (burst pendek ditoleransi). Dijaga di sisi klien supaya tidak kena 429.
+GLOBAL_SEND_RATE = 30.0
+CHAT_SEND_RATE = 1.0
+CHAT_SEND_BURST = 3
+# Method yang dihitung ke limit kirim di atas
+THROTTLED_METHODS = frozenset({'sendMessage', 'editMessageText', 'sendPhoto', 'sendDocument'})
+
+# Panjang maksimum teks satu pesan Telegram (karakter)
+MAX_MESSAGE_LEN = 4096
+
+# Timeout total per request API biasa (detik); session long-poll memakai poll_timeout + POLL_TIMEOUT_MARGIN
+API_TIMEOUT = 30.0
+POLL_TIMEOUT_MARGIN = 10.0
+
+# Telegram menampilkan 'typing' ~5 detik per sendChatAction. Ping pertama ditunda
+# TYPING_FIRST_DELAY supaya task yang selesai cepat tidak perlu ping sama sekali.
+TYPING_INTERVAL = 4.5
+TYPING_FIRST_DELAY = 1.0
+
+# Jenis update yang diminta dari getUpdates
+ALLOWED_UPDATES = ['message', 'edited_message', 'callback_query']
+
+# Maks update per getUpdates (batas Telegram). Batch penuh = masih ada backlog
+# → poll berikutnya tanpa long-poll sampai backlog habis.
+GET_UPDATES_LIMIT = 100
+
+# Maks handler update (pesan/callback) yang diproses bersamaan
+MAX_CONCURRENT_UPDATES = 64
+
+# ChatSession idle dibuang setelah SESSION_IDLE_TTL detik; maks MAX_CHAT_SESSIONS (LRU)
+SESSION_IDLE_TTL = 600.0
+MAX_CHAT_SESSIONS = 10_000
+
+# Upload foto/document paralel per chat; tempo kirim dijaga rate limiter per chat
+UPLOAD_CONCURRENCY = 3
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.webp')
+
+# Foto di atas ini dikirim sebagai document (batas sendPhoto Telegram)
+PHOTO_MAX_BYTES = 10 * 1024 * 1024
+# File di atas ini tidak dibaca utuh ke RAM, tapi di-stream dari disk saat upload
+STREAM_UPLOAD_MIN_BYTES = 10 * 1024 * 1024
+
 AGENT_ICONS = {
     'browser': '🌐',
     'chat': '💬',
@@ -59,26 +144,255 @@ AGENT_ICONS = {
 }
 
 
+# Inline keyboard statis: dibuat sekali, dipakai ulang di setiap pesan (jangan di-mutasi)
+MAIN_KEYBOARD: list[list[dict]] = [
+    [
+        {'text': '📊 Status', 'callback_data': 'cmd:status'},
+        {'text': '❓ Help', 'callback_data': 'cmd:help'},
+    ],
+    [
+        {'text': '🚫 Cancel', 'callback_data': 'cmd:cancel'},
+        {'text': '🧠 Memory', 'callback_data': 'cmd:memory'},
+    ],
+]
+RUNNING_KEYBOARD: list[list[dict]] = [[{'text': '🚫 Cancel Task', 'callback_data': 'cmd:cancel'}]]
+DONE_KEYBOARD: list[list[dict]] = [
+    [
+        {'text': '📊 Status', 'callback_data': 'cmd:status'},
+        {'text': '🧠 Memory', 'callback_data': 'cmd:memory'},
+    ],
+]
+
+# Deteksi agent dari teks status: satu scan regex, bukan loop `in` per nama
+_AGENT_NAME_RE = re.compile(r'browser|chat|memory', re.IGNORECASE)
+# Jika beberapa nama muncul, yang paling kanan di tuple ini menang (perilaku lama)
+_AGENT_PRIORITY = ('memory', 'chat', 'browser')
+
+# Template pesan progress: satu format_map per edit, bukan list + join
+_PROGRESS_TMPL = (
+    '<b>{icon} Agent Berjalan</b>\n'
+    '<code>{task}</code>\n'
+    '\n'
+    '<b>Waktu:</b> {elapsed} {bar}'
+    '{status}'
+)
+
+
+# Teks /start & /help: template statis, hanya nama yang diisi (sudah di-escape HTML)
+_START_TMPL = (
+    'Halo <b>{owner}</b>! 👋\n\n'
+    'Saya <b>{ai_name}</b> — asisten AI personal kamu.\n'
+    'Saya bisa browsing internet, menjawab pertanyaan, '
+    'dan mengingat percakapan kita.\n\n'
+    '<b>Cara pakai:</b>\n'
+    'Cukup kirim pesan biasa — saya akan otomatis pilih cara terbaik:\n'
+    '  🌐 Browsing web jika perlu internet\n'
+    '  💬 Jawab langsung jika bisa\n'
+    '  🧠 Ingat preferensimu lintas sesi\n\n'
+    '<b>Contoh:</b>\n'
+    '<code>cari harga iPhone 16 di tokopedia</code>\n'
+    '<code>jelaskan apa itu transformer dalam AI</code>\n'
+    '<code>ingat bahwa saya suka hasil dalam bahasa Indonesia</code>\n\n'
+    '<b>Perintah:</b>\n'
+    '  /status — status bot\n'
+    '  /history — riwayat task\n'
+    '  /memory — memory tersimpan\n'
+    '  /forget — hapus memory\n'
+    '  /clear — reset percakapan\n'
+    '  /help — bantuan lengkap'
+)
+_HELP_TMPL = (
+    '<b>{ai_name} — Panduan</b>\n\n'
+    '<b>Cukup kirim pesan biasa</b>, tidak perlu prefix /task.\n'
+    'AI akan otomatis memilih:\n'
+    '  🌐 <b>Browser</b> — untuk browsing, cari info online, screenshot\n'
+    '  💬 <b>Chat</b> — untuk Q&amp;A, penjelasan, penulisan, kalkulasi\n'
+    '  🧠 <b>Memory</b> — untuk simpan/recall preferensi\n\n'
+    '<b>Contoh pesan:</b>\n'
+    '<code>buka tokopedia dan cari laptop gaming</code>\n'
+    '<code>berapa jarak bumi ke bulan?</code>\n'
+    '<code>tulis email permohonan cuti</code>\n'
+    '<code>ingat bahwa saya tinggal di Jakarta</code>\n'
+    '<code>kamu ingat apa tentang saya?</code>\n\n'
+    '<b>Perintah bot:</b>\n'
+    '  /cancel — batalkan task berjalan\n'
+    '  /status — cek status\n'
+    '  /history — 5 task terakhir\n'
+    '  /memory — lihat memory\n'
+    '  /forget — hapus semua memory\n'
+    '  /clear — reset riwayat percakapan'
+)
+
+
 # ─── Progress bar helper ──────────────────────────────────────────────────────
 
+@functools.lru_cache(maxsize=None)
+def _progress_bars(width: int) -> tuple[str, ...]:
+    """Semua frame progress bar untuk satu lebar (width + 1 posisi), dibuat sekali."""
+    return tuple(
+        f"[{('░' * pos + '█' + '░' * (width - pos))[:width]}]"
+        for pos in range(width + 1)
+    )
+
+
 def make_progress_bar(elapsed: int, width: int = 16) -> str:
     """Progress bar bergerak (tidak butuh total step yang tidak diketahui)."""
-    pos = (elapsed // 2) % (width + 1)
-    bar = '░' * pos + '█' + '░' * (width - pos)
-    return f'[{bar[:width]}]'
+    bars = _progress_bars(width)
+    return bars[(elapsed // 2) % len(bars)]
+
+
+@functools.lru_cache(maxsize=1024)
+def _format_elapsed(elapsed: int) -> str:
+    """Durasi detik → '1m 5s' / '45s'."""
+    mins, secs = divmod(elapsed, 60)
+    return f'{mins}m {secs}s' if mins else f'{secs}s'
+
+
+# Tag pembuka/penutup HTML Telegram (<b>, <a href="...">, </pre>, ...)
+_HTML_TAG_RE = re.compile(r'<(/?)([a-zA-Z][\w-]*)[^>]*>')
+
+
+def _safe_cut(text: str, start: int, limit: int) -> int:
+    """
+    Posisi akhir potongan text[start:limit]: setelah baris baru terakhir, atau
+    setelah spasi terakhir, atau paksa di limit. Tidak pernah di tengah tag
+    atau entity (&amp; dll). Selalu > start.
+    """
+    # Tag di awal jendela tidak boleh jadi satu-satunya isi potongan
+    lo = start
+    while text.startswith('<', lo):
+        gt = text.find('>', lo, limit)
+        if gt == -1:
+            break
+        lo = gt + 1
+    cut = text.rfind('\n', lo, limit)
+    if cut <= lo:
+        cut = text.rfind(' ', lo, limit)
+    end = cut + 1 if cut > lo else limit
+    lt = text.rfind('<', lo, end)
+    if lt > lo and lt > text.rfind('>', lo, end):
+        end = lt
+    amp = text.rfind('&', lo, end)
+    if amp > lo and amp > text.rfind(';', lo, end):
+        end = amp
+    return end
+
+
+def _open_tags(text: str, start: int, end: int, stack: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Stack elemen (nama, tag pembuka) yang masih terbuka setelah text[start:end]."""
+    stack = list(stack)
+    for m in _HTML_TAG_RE.finditer(text, start, end):
+        name = m.group(2).lower()
+        if not m.group(1):
+            stack.append((name, m.group(0)))
+            continue
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i][0] == name:
+                del stack[i]
+                break
+    return stack
+
+
+def _split_html(text: str, max_len: int) -> Iterator[str]:
+    """
+    Pecah pesan HTML Telegram menjadi potongan maks max_len karakter.
+    Dipotong setelah baris baru terakhir dalam jendela, jika tidak ada setelah
+    spasi terakhir, dan tidak pernah di tengah tag/entity. Elemen yang masih
+    terbuka di titik potong ditutup di akhir potongan dan dibuka lagi (dengan
+    atribut yang sama) di awal potongan berikutnya, jadi setiap potongan adalah
+    HTML yang valid untuk parse_mode=HTML.
+    """
+    total = len(text)
+    stack: list[tuple[str, str]] = []
+    start = 0
+    while start < total:
+        prefix = ''.join(tag for _, tag in stack)
+        budget = max(max_len - len(prefix), 1)
+        while True:
+            limit = min(start + budget, total)
+            end = total if limit >= total else _safe_cut(text, start, limit)
+            after = _open_tags(text, start, end, stack)
+            # Tag penutup asli tepat setelah titik potong ikut potongan ini,
+            # supaya potongan berikutnya tidak berisi elemen kosong saja
+            while after and (m := _HTML_TAG_RE.match(text, end)) and m.group(1) and m.group(2).lower() == after[-1][0]:
+                end = m.end()
+                after.pop()
+            suffix = ''.join(f'</{name}>' for name, _ in reversed(after))
+            over = len(prefix) + (end - start) + len(suffix) - max_len
+            if over <= 0 or budget <= 1:
+                break
+            # Tag penutup tidak muat → perkecil jendela lalu cari titik potong lagi
+            budget = max(budget - over, 1)
+        chunk = prefix + text[start:end] + suffix
+        # Potongan tanpa teks terlihat ditolak Telegram ("message text is empty")
+        if _HTML_TAG_RE.sub('', chunk).strip():
+            yield chunk
+        stack = after
+        start = end
+
+
+def _needs_handling(update: dict) -> bool:
+    """False untuk update yang pasti diabaikan (foto/stiker/pesan servis tanpa teks)."""
+    if 'callback_query' in update:
+        return True
+    message = update.get('message') or update.get('edited_message')
+    return bool(message and message.get('text'))
+
+
+def _allow_all(chat_id: int) -> bool:
+    return True
+
+
+@functools.lru_cache(maxsize=4)
+def _help_text(ai_name: str) -> str:
+    """Teks /help siap kirim. Di-cache per nama AI (berubah hanya jika persona diubah)."""
+    return _HELP_TMPL.format(ai_name=html.escape(ai_name))
+
+
+# ─── Rate limiter ─────────────────────────────────────────────────────────────
+
+class _TokenBucket:
+    """
+    Token bucket async: `rate` token/detik, maks `capacity` token tersimpan.
+    acquire() langsung memesan token (saldo boleh minus) lalu tidur sebesar
+    defisitnya, jadi pemanggil bersamaan dilayani berurutan tanpa lock.
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def is_full(self, now: float) -> bool:
+        """True jika saldo sudah terisi penuh lagi (setara bucket baru)."""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate) - 1
+        self.updated = now
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
 
 
 # ─── Session state per-chat ───────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class ChatSession:
     """State untuk setiap chat aktif."""
     chat_id: int
     task_coroutine: asyncio.Task | None = None
     progress_msg_id: int | None = None
-    start_time: float = field(default_factory=time.time)
-    last_update_text: str = ''     # teks terakhir yang diedit (untuk dedup)
+    start_time: float = field(default_factory=time.monotonic)
+    last_update_hash: int = 0      # hash (teks, keyboard) progress terakhir yang diedit (untuk dedup)
     agent_used: str = ''
+    task_preview: str = ''         # potongan task (sudah di-escape HTML) untuk pesan progress, dihitung sekali per task
+    pending_status: str = ''       # status terbaru yang belum dirender ke pesan progress
+    last_edit_at: float = 0.0      # waktu edit progress terakhir (monotonic)
+    flush_task: asyncio.Task | None = None  # edit progress terjadwal (trailing-edge)
 
 
 # ─── TelegramChannel ─────────────────────────────────────────────────────────
@@ -97,33 +411,154 @@ class TelegramChannel(BaseChannel):
         token: str,
         allowed_users: list[int] | None = None,
         poll_timeout: int = 30,
+        webhook_url: str | None = None,
+        webhook_host: str = '0.0.0.0',
+        webhook_port: int = 8443,
+        webhook_secret: str | None = None,
         **kwargs: Any,
     ):
         super().__init__(supervisor, **kwargs)
         self.token = token
-        self.allowed_users = set(allowed_users) if allowed_users else None
+        self._api_base = TELEGRAM_API.format(token=token, method='')  # URL tanpa nama method
+        self.allowed_users = frozenset(allowed_users) if allowed_users else None
+        # Cek whitelist per update: di-bind sekali (tanpa whitelist → selalu True)
+        self._is_allowed: Callable[[int], bool] = (
+            self.allowed_users.__contains__ if self.allowed_users is not None else _allow_all
+        )
         self.poll_timeout = poll_timeout
+        # Webhook diisi → terima update via HTTP server sendiri, bukan getUpdates
+        self.webhook_url = webhook_url
+        self.webhook_host = webhook_host
+        self.webhook_port = webhook_port
+        self.webhook_secret = webhook_secret
         self._offset = 0
         self._running = False
-        self._session: aiohttp.ClientSession | None = None
-        self._chats: dict[int, ChatSession] = {}
+        self._stopped = asyncio.Event()
+        self._session: aiohttp.ClientSession | None = None       # send/edit/command API
+        self._poll_session: aiohttp.ClientSession | None = None  # khusus long-poll getUpdates
+        self._chats: OrderedDict[int, ChatSession] = OrderedDict()  # urut LRU
+        # Chat yang sedang menjalankan task → waktu mulai (monotonic); dikirimi 'typing' oleh _typing_ticker
+        self._typing_chats: dict[int, float] = {}
+        self._typing_task: asyncio.Task | None = None
+        self._bot_username = ''  # lowercase, diisi dari getMe saat start()
+        # Batasi handler update yang berjalan bersamaan (backpressure saat burst)
+        self._handle_sem = asyncio.Semaphore(MAX_CONCURRENT_UPDATES)
+        # Referensi kuat ke task fire-and-forget (handler update, ping typing pertama);
+        # event loop hanya menyimpan weakref, task tanpa referensi bisa di-GC di tengah jalan
+        self._bg_tasks: set[asyncio.Task] = set()
+        # Rate limiter kirim pesan: satu global + satu per chat_id
+        self._global_bucket = _TokenBucket(GLOBAL_SEND_RATE, GLOBAL_SEND_RATE)
+        # Urut terakhir dipakai; bucket yang sudah penuh lagi dibuang (lihat _throttle)
+        self._chat_buckets: OrderedDict[int, _TokenBucket] = OrderedDict()
+        # Dispatch command → handler(chat_id, msg_id), di-bind sekali. /start & /task
+        # butuh argumen lain sehingga ditangani terpisah di _handle_update.
+        self._commands: dict[str, Callable[[int, int], Awaitable[None]]] = {
+            '/help': self._cmd_help,
+            '/status': self._cmd_status,
+            '/cancel': self._cmd_cancel,
+            '/history': self._cmd_history,
+            '/memory': self._cmd_memory,
+            '/forget': self._cmd_forget,
+            '/clear': self._cmd_clear,
+        }
+        # callback_data tombol inline → handler
+        self._callbacks: dict[str, Callable[[int, int], Awaitable[None]]] = {
+            'cmd:status': self._cmd_status,
+            'cmd:help': self._cmd_help,
+            'cmd:cancel': self._cmd_cancel,
+            'cmd:memory': self._cmd_memory,
+        }
 
     # ─── Telegram API helpers ─────────────────────────────────────────
 
     def _url(self, method: str) -> str:
-        return TELEGRAM_API.format(token=self.token, method=method)
+        return self._api_base + method
+
+    async def _post(
+        self,
+        method: str,
+        params: dict[str, Any] | None = None,
+        form: Callable[[], aiohttp.FormData] | None = None,
+        session: aiohttp.ClientSession | None = None,
+        chat_id: int | None = None,
+    ) -> dict:
+        """
+        POST ke Bot API, return JSON response mentah.
+        Rate limit (429) di-retry maks MAX_API_RETRIES kali; error server (5xx)
+        juga, tapi hanya untuk IDEMPOTENT_METHODS.
+        `form` adalah factory karena FormData hanya bisa dikirim sekali.
+        `session` default-nya self._session; long-poll memakai self._poll_session.
+        `chat_id` untuk rate limiter per chat (default diambil dari params).
+        """
+        if session is None:
+            session = self._session
+        assert session is not None
+        url = self._url(method)
+        # Body JSON di-encode sekali (langsung ke bytes) dan dipakai ulang saat retry
+        body = _json_body(params or {}) if form is None else None
+        throttled = method in THROTTLED_METHODS
+        retry_5xx = method in IDEMPOTENT_METHODS
+        if throttled and chat_id is None and params:
+            chat_id = params.get('chat_id')
+        attempt = 0
+        while True:
+            if throttled:
+                await self._throttle(chat_id)
+            if body is not None:
+                kwargs: dict[str, Any] = {'data': body, 'headers': _JSON_HEADERS}
+            else:
+                kwargs = {'data': form()}
+            async with session.post(url, **kwargs) as resp:
+                if resp.status >= 500:
+                    # Body 5xx sering bukan JSON (halaman error proxy)
+                    data: dict = {'ok': False, 'error_code': resp.status}
+                else:
+                    # Parse bytes langsung: tanpa decode ke str dulu seperti resp.json()
+                    data = _json_loads(await resp.read())
+            if data.get('ok') or attempt >= MAX_API_RETRIES:
+                return data
+            code = data.get('error_code')
+            if code == 429:
+                retry_after = (data.get('parameters') or {}).get('retry_after', 1)
+                delay = min(float(retry_after), RETRY_AFTER_MAX)
+            elif retry_5xx and isinstance(code, int) and code >= 500:
+                delay = 0.5 * 2 ** attempt
+            else:
+                return data
+            logger.info(f'Telegram [{method}]: error {code}, retry dalam {delay:.1f}s')
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _throttle(self, chat_id: int | None) -> None:
+        """Tunggu token kirim: per chat dulu, lalu global."""
+        if chat_id is not None:
+            buckets = self._chat_buckets
+            # Bucket yang sudah penuh lagi sama dengan bucket baru → aman dibuang.
+            # Disapu dari yang paling lama tidak dipakai, jadi chat tanpa session
+            # (user ditolak, /help, /status) tidak menumpuk selamanya.
+            now = time.monotonic()
+            while buckets:
+                oldest = next(iter(buckets.values()))
+                if not oldest.is_full(now):
+                    break
+                buckets.popitem(last=False)
+            bucket = buckets.get(chat_id)
+            if bucket is None:
+                bucket = buckets[chat_id] = _TokenBucket(CHAT_SEND_RATE, CHAT_SEND_BURST)
+            else:
+                buckets.move_to_end(chat_id)
+            await bucket.acquire()
+        await self._global_bucket.acquire()
 
     async def _api(self, method: str, **params: Any) -> dict:
-        assert self._session is not None
         try:
-            async with self._session.post(self._url(method), json=params) as resp:
-                data = await resp.json()
-                if not data.get('ok'):
-                    desc = data.get('description', 'unknown error')
-                    if 'message is not modified' not in desc:
-                        logger.warning(f'Telegram [{method}]: {desc}')
-                    return {}
-                return data.get('result', {})
+            data = await self._post(method, params)
+            if not data.get('ok'):
+                desc = data.get('description', 'unknown error')
+                if 'message is not modified' not in desc:
+                    logger.warning(f'Telegram [{method}]: {desc}')
+                return {}
+            return data.get('result', {})
         except Exception as e:
             logger.error(f'Telegram API [{method}]: {e}')
             return {}
@@ -137,9 +572,29 @@ class TelegramChannel(BaseChannel):
         parse_mode: str = 'HTML',
     ) -> int | None:
         """Kirim pesan, return message_id."""
-        max_len = 4096
+        # Jalur umum: pesan muat dalam satu sendMessage
+        if len(text) <= MAX_MESSAGE_LEN:
+            params: dict[str, Any] = {'chat_id': chat_id, 'text': text, 'parse_mode': parse_mode}
+            if reply_to:
+                params['reply_to_message_id'] = reply_to
+            if keyboard:
+                params['reply_markup'] = {'inline_keyboard': keyboard}
+            result = await self._api('sendMessage', **params)
+            return result.get('message_id')
+        return await self._send_long(chat_id, text, reply_to, keyboard, parse_mode)
+
+    async def _send_long(
+        self,
+        chat_id: int,
+        text: str,
+        reply_to: int | None,
+        keyboard: list[list[dict]] | None,
+        parse_mode: str,
+    ) -> int | None:
+        """Kirim pesan lebih dari MAX_MESSAGE_LEN karakter sebagai beberapa pesan."""
+        chunks = list(_split_html(text, MAX_MESSAGE_LEN))
+        last = len(chunks) - 1
         msg_id = None
-        chunks = [text[i: i + max_len] for i in range(0, max(len(text), 1), max_len)]
         for i, chunk in enumerate(chunks):
             params: dict[str, Any] = {
                 'chat_id': chat_id,
@@ -148,7 +603,7 @@ class TelegramChannel(BaseChannel):
             }
             if reply_to and i == 0:
                 params['reply_to_message_id'] = reply_to
-            if keyboard and i == len(chunks) - 1:
+            if keyboard and i == last:
                 params['reply_markup'] = {'inline_keyboard': keyboard}
             result = await self._api('sendMessage', **params)
             if i == 0:
@@ -165,7 +620,7 @@ class TelegramChannel(BaseChannel):
         params: dict[str, Any] = {
             'chat_id': chat_id,
             'message_id': message_id,
-            'text': text[:4096],
+            'text': text[:MAX_MESSAGE_LEN],
             'parse_mode': 'HTML',
         }
         if keyboard is not None:
@@ -178,6 +633,25 @@ class TelegramChannel(BaseChannel):
     async def _typing(self, chat_id: int) -> None:
         await self._api('sendChatAction', chat_id=chat_id, action='typing')
 
+    async def _typing_ticker(self) -> None:
+        """
+        Kirim 'typing' ke semua chat aktif sekaligus setiap TYPING_INTERVAL detik.
+        Chat yang baru mulai (< TYPING_FIRST_DELAY) dilewati — ping pertamanya
+        urusan _typing_first, jadi task singkat tidak pernah di-ping.
+        """
+        while self._running:
+            now = time.monotonic()
+            due = [c for c, started in self._typing_chats.items() if now - started >= TYPING_FIRST_DELAY]
+            if due:
+                await asyncio.gather(*(self._typing(c) for c in due))
+            await asyncio.sleep(TYPING_INTERVAL)
+
+    async def _typing_first(self, chat_id: int, started: float) -> None:
+        """Ping 'typing' pertama, hanya jika task yang sama masih berjalan setelah TYPING_FIRST_DELAY."""
+        await asyncio.sleep(TYPING_FIRST_DELAY)
+        if self._typing_chats.get(chat_id) == started:
+            await self._typing(chat_id)
+
     async def _send_photo(
         self,
         chat_id: int,
@@ -187,111 +661,175 @@ class TelegramChannel(BaseChannel):
     ) -> int | None:
         assert self._session is not None
         path = Path(photo_path)
-        if not path.exists():
+        # Baca file di thread: file besar tidak memblokir chat lain
+        try:
+            size, content = await self._read_upload(path)
+        except FileNotFoundError:
             logger.warning(f'File tidak ditemukan: {photo_path}')
             return None
-        file_size = path.stat().st_size
-        use_document = file_size > 10 * 1024 * 1024
-        try:
+        except OSError as e:
+            logger.error(f'Error baca foto: {e}')
+            return None
+        use_document = size > PHOTO_MAX_BYTES
+        field_name = 'document' if use_document else 'photo'
+        mime = {'.png': 'image/png', '.webp': 'image/webp'}.get(path.suffix.lower(), 'image/jpeg')
+
+        def build_form() -> aiohttp.FormData:
             form = aiohttp.FormData()
             form.add_field('chat_id', str(chat_id))
             if caption:
                 form.add_field('caption', caption[:1024])
                 form.add_field('parse_mode', 'HTML')
             if keyboard:
-                form.add_field('reply_markup', json.dumps({'inline_keyboard': keyboard}))
-            with open(photo_path, 'rb') as f:
-                field_name = 'document' if use_document else 'photo'
-                ext = path.suffix.lower()
-                mime = 'image/png' if ext == '.png' else 'image/jpeg'
-                form.add_field(field_name, f, filename=path.name, content_type=mime)
-                method = 'sendDocument' if use_document else 'sendPhoto'
-                async with self._session.post(self._url(method), data=form) as resp:
-                    data = await resp.json()
-                    if data.get('ok'):
-                        return data.get('result', {}).get('message_id')
-                    logger.error(f'Gagal kirim foto: {data.get("description")}')
-                    return None
+                form.add_field('reply_markup', _json_dumps({'inline_keyboard': keyboard}))
+            form.add_field(field_name, content if content is not None else path.open('rb'),
+                           filename=path.name, content_type=mime)
+            return form
+
+        try:
+            data = await self._post('sendDocument' if use_document else 'sendPhoto', form=build_form, chat_id=chat_id)
+            if data.get('ok'):
+                return data.get('result', {}).get('message_id')
+            logger.error(f'Gagal kirim foto: {data.get("description")}')
+            return None
         except Exception as e:
             logger.error(f'Error kirim foto: {e}')
             return None
 
+    @staticmethod
+    async def _read_upload(path: Path) -> tuple[int, bytes | None]:
+        """
+        Return (ukuran, isi) file yang akan di-upload, I/O di thread.
+        Isi None untuk file > STREAM_UPLOAD_MIN_BYTES: form membuka file sendiri
+        dan aiohttp men-stream-nya per chunk (RAM O(chunk), bukan O(ukuran file)).
+        """
+        size = (await asyncio.to_thread(path.stat)).st_size
+        if size > STREAM_UPLOAD_MIN_BYTES:
+            return size, None
+        return size, await asyncio.to_thread(path.read_bytes)
+
+    async def _send_photos(self, chat_id: int, photo_paths: list[str]) -> None:
+        """
+        Kirim beberapa screenshot. Foto pertama (ber-caption) dikirim dulu agar
+        tampil paling atas; sisanya di-upload paralel, maks UPLOAD_CONCURRENCY
+        sekaligus (tempo diatur _throttle, 429 di-retry oleh _post).
+        """
+        cap = f'📸 <b>Screenshot</b> ({len(photo_paths)} gambar)'
+        await self._send_photo(chat_id, photo_paths[0], caption=cap)
+        if len(photo_paths) == 1:
+            return
+        sem = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+        async def _one(path: str) -> None:
+            async with sem:
+                await self._send_photo(chat_id, path)
+
+        await asyncio.gather(*(_one(p) for p in photo_paths[1:]))
+
+    async def _send_documents(self, chat_id: int, file_paths: list[str]) -> None:
+        """Upload beberapa file paralel, maks UPLOAD_CONCURRENCY sekaligus."""
+        sem = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+
+        async def _one(path: str) -> None:
+            async with sem:
+                await self._send_document(chat_id, path)
+
+        await asyncio.gather(*(_one(p) for p in file_paths))
+
     async def _send_document(self, chat_id: int, file_path: str, caption: str = '') -> None:
         assert self._session is not None
         path = Path(file_path)
-        if not path.exists():
-            return
         try:
+            _, content = await self._read_upload(path)
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.error(f'Error baca document: {e}')
+            return
+
+        def build_form() -> aiohttp.FormData:
             form = aiohttp.FormData()
             form.add_field('chat_id', str(chat_id))
             if caption:
                 form.add_field('caption', caption[:1024])
-            with open(file_path, 'rb') as f:
-                form.add_field('document', f, filename=path.name)
-                async with self._session.post(self._url('sendDocument'), data=form) as resp:
-                    data = await resp.json()
-                    if not data.get('ok'):
-                        logger.error(f'Gagal kirim document: {data.get("description")}')
+            form.add_field('document', content if content is not None else path.open('rb'), filename=path.name)
+            return form
+
+        try:
+            data = await self._post('sendDocument', form=build_form, chat_id=chat_id)
+            if not data.get('ok'):
+                logger.error(f'Gagal kirim document: {data.get("description")}')
         except Exception as e:
             logger.error(f'Error kirim document: {e}')
 
     # ─── Keyboard layouts ─────────────────────────────────────────────
 
     def _main_keyboard(self) -> list[list[dict]]:
-        return [
-            [
-                {'text': '📊 Status', 'callback_data': 'cmd:status'},
-                {'text': '❓ Help', 'callback_data': 'cmd:help'},
-            ],
-            [
-                {'text': '🚫 Cancel', 'callback_data': 'cmd:cancel'},
-                {'text': '🧠 Memory', 'callback_data': 'cmd:memory'},
-            ],
-        ]
+        return MAIN_KEYBOARD
 
     def _running_keyboard(self) -> list[list[dict]]:
-        return [[{'text': '🚫 Cancel Task', 'callback_data': 'cmd:cancel'}]]
+        return RUNNING_KEYBOARD
 
     def _done_keyboard(self) -> list[list[dict]]:
-        return [
-            [
-                {'text': '📊 Status', 'callback_data': 'cmd:status'},
-                {'text': '🧠 Memory', 'callback_data': 'cmd:memory'},
-            ],
-        ]
+        return DONE_KEYBOARD
 
     # ─── Session helpers ──────────────────────────────────────────────
 
     def _get_session(self, chat_id: int) -> ChatSession:
-        if chat_id not in self._chats:
-            self._chats[chat_id] = ChatSession(chat_id=chat_id)
-        return self._chats[chat_id]
+        session = self._chats.get(chat_id)
+        if session is None:
+            session = self._chats[chat_id] = ChatSession(chat_id=chat_id)
+            if len(self._chats) > MAX_CHAT_SESSIONS:
+                self._evict_lru()
+        else:
+            self._chats.move_to_end(chat_id)
+        return session
+
+    def _evict_lru(self) -> None:
+        """Buang session idle paling lama tidak dipakai sampai di bawah MAX_CHAT_SESSIONS."""
+        for chat_id in list(self._chats):
+            if len(self._chats) <= MAX_CHAT_SESSIONS:
+                break
+            if not self._is_busy(chat_id):
+                del self._chats[chat_id]
+
+    def _evict_if_idle(self, chat_id: int) -> None:
+        """Dipanggil SESSION_IDLE_TTL setelah task selesai: buang session jika tidak ada task baru."""
+        session = self._chats.get(chat_id)
+        if session is None or self._is_busy(chat_id):
+            return
+        if time.monotonic() - session.start_time >= SESSION_IDLE_TTL:
+            del self._chats[chat_id]
 
     def _is_busy(self, chat_id: int) -> bool:
         s = self._chats.get(chat_id)
         return s is not None and s.task_coroutine is not None and not s.task_coroutine.done()
 
-    def _is_allowed(self, chat_id: int) -> bool:
-        return self.allowed_users is None or chat_id in self.allowed_users
-
     # ─── Progress message ─────────────────────────────────────────────
 
+    @staticmethod
+    def _stop_progress_flush(session: ChatSession) -> None:
+        """Batalkan edit progress terjadwal agar tidak menimpa pesan akhir."""
+        if session.flush_task is not None and not session.flush_task.done():
+            session.flush_task.cancel()
+        session.flush_task = None
+
+    @staticmethod
+    def _task_preview(task: str) -> str:
+        """Potongan task untuk pesan progress, di-escape HTML."""
+        return html.escape(task[:60] + '...' if len(task) > 60 else task)
+
     def _build_progress(self, task: str, session: ChatSession, status_line: str = '') -> str:
-        elapsed = int(time.time() - session.start_time)
-        mins, secs = divmod(elapsed, 60)
-        elapsed_str = f'{mins}m {secs}s' if mins else f'{secs}s'
-        bar = make_progress_bar(elapsed)
-        task_preview = task[:60] + '...' if len(task) > 60 else task
-        agent_icon = AGENT_ICONS.get(session.agent_used, '⚡')
-        lines = [
-            f'<b>{agent_icon} Agent Berjalan</b>',
-            f'<code>{task_preview}</code>',
-            '',
-            f'<b>Waktu:</b> {elapsed_str} {bar}',
-        ]
-        if status_line:
-            lines.append(f'<b>Status:</b> {status_line}')
-        return '\n'.join(lines)
+        elapsed = int(time.monotonic() - session.start_time)
+        if not session.task_preview:
+            session.task_preview = self._task_preview(task)
+        return _PROGRESS_TMPL.format_map({
+            'icon': AGENT_ICONS.get(session.agent_used, '⚡'),
+            'task': session.task_preview,
+            'elapsed': _format_elapsed(elapsed),
+            'bar': make_progress_bar(elapsed),
+            'status': f'\n<b>Status:</b> {html.escape(status_line)}' if status_line else '',
+        })
 
     # ─── Command handlers ─────────────────────────────────────────────
 
@@ -301,62 +839,19 @@ class TelegramChannel(BaseChannel):
         # Prioritas sapaan: nama owner dari identity.md > username Telegram
         owner = persona.owner_callname or persona.owner_name or username
 
-        text = (
-            f'Halo <b>{owner}</b>! 👋\n\n'
-            f'Saya <b>{ai_name}</b> — asisten AI personal kamu.\n'
-            f'Saya bisa browsing internet, menjawab pertanyaan, '
-            f'dan mengingat percakapan kita.\n\n'
-            f'<b>Cara pakai:</b>\n'
-            f'Cukup kirim pesan biasa — saya akan otomatis pilih cara terbaik:\n'
-            f'  🌐 Browsing web jika perlu internet\n'
-            f'  💬 Jawab langsung jika bisa\n'
-            f'  🧠 Ingat preferensimu lintas sesi\n\n'
-            f'<b>Contoh:</b>\n'
-            f'<code>cari harga iPhone 16 di tokopedia</code>\n'
-            f'<code>jelaskan apa itu transformer dalam AI</code>\n'
-            f'<code>ingat bahwa saya suka hasil dalam bahasa Indonesia</code>\n\n'
-            f'<b>Perintah:</b>\n'
-            f'  /status — status bot\n'
-            f'  /history — riwayat task\n'
-            f'  /memory — memory tersimpan\n'
-            f'  /forget — hapus memory\n'
-            f'  /clear — reset percakapan\n'
-            f'  /help — bantuan lengkap'
-        )
+        text = _START_TMPL.format(owner=html.escape(owner), ai_name=html.escape(ai_name))
         await self._send(chat_id, text, reply_to=msg_id, keyboard=self._main_keyboard())
 
     async def _cmd_help(self, chat_id: int, msg_id: int) -> None:
-        ai_name = get_persona().ai_name
-        text = (
-            f'<b>{ai_name} — Panduan</b>\n\n'
-            f'<b>Cukup kirim pesan biasa</b>, tidak perlu prefix /task.\n'
-            f'AI akan otomatis memilih:\n'
-            f'  🌐 <b>Browser</b> — untuk browsing, cari info online, screenshot\n'
-            f'  💬 <b>Chat</b> — untuk Q&amp;A, penjelasan, penulisan, kalkulasi\n'
-            f'  🧠 <b>Memory</b> — untuk simpan/recall preferensi\n\n'
-            f'<b>Contoh pesan:</b>\n'
-            f'<code>buka tokopedia dan cari laptop gaming</code>\n'
-            f'<code>berapa jarak bumi ke bulan?</code>\n'
-            f'<code>tulis email permohonan cuti</code>\n'
-            f'<code>ingat bahwa saya tinggal di Jakarta</code>\n'
-            f'<code>kamu ingat apa tentang saya?</code>\n\n'
-            f'<b>Perintah bot:</b>\n'
-            f'  /cancel — batalkan task berjalan\n'
-            f'  /status — cek status\n'
-            f'  /history — 5 task terakhir\n'
-            f'  /memory — lihat memory\n'
-            f'  /forget — hapus semua memory\n'
-            f'  /clear — reset riwayat percakapan'
-        )
+        text = _help_text(get_persona().ai_name)
         await self._send(chat_id, text, reply_to=msg_id, keyboard=self._main_keyboard())
 
     async def _cmd_status(self, chat_id: int, msg_id: int) -> None:
         busy = self._is_busy(chat_id)
         if busy:
             session = self._get_session(chat_id)
-            elapsed = int(time.time() - session.start_time)
-            mins, secs = divmod(elapsed, 60)
-            elapsed_str = f'{mins}m {secs}s' if mins else f'{secs}s'
+            elapsed = int(time.monotonic() - session.start_time)
+            elapsed_str = _format_elapsed(elapsed)
             icon = AGENT_ICONS.get(session.agent_used, '⚡')
             text = (
                 f'<b>📊 Status</b>\n\n'
@@ -387,7 +882,7 @@ class TelegramChannel(BaseChannel):
         try:
             records = await db.task_list('telegram', str(chat_id), limit=5)
         except Exception as e:
-            await self._send(chat_id, f'❌ Gagal: <code>{e}</code>', reply_to=msg_id)
+            await self._send(chat_id, f'❌ Gagal: <code>{html.escape(str(e), quote=False)}</code>', reply_to=msg_id)
             return
         if not records:
             await self._send(chat_id, 'Belum ada riwayat.', reply_to=msg_id, keyboard=self._main_keyboard())
@@ -398,14 +893,14 @@ class TelegramChannel(BaseChannel):
             icon = icons.get(r.status, '•')
             prompt = r.prompt[:60] + '...' if len(r.prompt) > 60 else r.prompt
             dur = f'{r.duration_ms // 1000}s' if r.duration_ms else '—'
-            lines.append(f'{i}. {icon} <code>{prompt}</code>\n   {r.status} | {dur}')
+            lines.append(f'{i}. {icon} <code>{html.escape(prompt, quote=False)}</code>\n   {r.status} | {dur}')
         await self._send(chat_id, '\n\n'.join(lines), reply_to=msg_id, keyboard=self._main_keyboard())
 
     async def _cmd_memory(self, chat_id: int, msg_id: int) -> None:
         try:
             memories = await db.memory_get_context('telegram', str(chat_id), limit=10)
         except Exception as e:
-            await self._send(chat_id, f'❌ Gagal: <code>{e}</code>', reply_to=msg_id)
+            await self._send(chat_id, f'❌ Gagal: <code>{html.escape(str(e), quote=False)}</code>', reply_to=msg_id)
             return
         if not memories:
             await self._send(
@@ -417,7 +912,7 @@ class TelegramChannel(BaseChannel):
         lines = ['<b>🧠 Memory Tersimpan</b>\n']
         for m in reversed(memories):
             ts = m.created_at.strftime('%d/%m %H:%M') if m.created_at else '—'
-            lines.append(f'[{m.mem_type}] <i>{ts}</i>\n{m.content[:120]}')
+            lines.append(f'[{m.mem_type}] <i>{ts}</i>\n{html.escape(m.content[:120], quote=False)}')
         lines.append('\n/forget untuk hapus semua.')
         await self._send(chat_id, '\n\n'.join(lines), reply_to=msg_id, keyboard=self._main_keyboard())
 
@@ -426,7 +921,7 @@ class TelegramChannel(BaseChannel):
             count = await db.memory_delete('telegram', str(chat_id))
             await self._send(chat_id, f'🗑 {count} memory dihapus.', reply_to=msg_id, keyboard=self._main_keyboard())
         except Exception as e:
-            await self._send(chat_id, f'❌ Gagal: <code>{e}</code>', reply_to=msg_id)
+            await self._send(chat_id, f'❌ Gagal: <code>{html.escape(str(e), quote=False)}</code>', reply_to=msg_id)
 
     async def _cmd_clear(self, chat_id: int, msg_id: int) -> None:
         """Hapus conversation history (context multi-turn) untuk chat ini."""
@@ -461,81 +956,85 @@ class TelegramChannel(BaseChannel):
             return
 
         session = self._get_session(chat_id)
-        session.start_time = time.time()
+        session.start_time = time.monotonic()
         session.agent_used = ''
         session.progress_msg_id = None
-        session.last_update_text = ''
+        session.last_update_hash = 0
+        session.pending_status = ''
+        session.last_edit_at = 0.0  # edit pertama boleh langsung
+        session.task_preview = self._task_preview(text)
 
         # Kirim pesan progress awal
         init_text = (
             f'<b>⏳ Memproses...</b>\n'
-            f'<code>{text[:60]}{"..." if len(text) > 60 else ""}</code>\n\n'
+            f'<code>{session.task_preview}</code>\n\n'
             f'Menganalisis task...'
         )
         prog_msg_id = await self._send(chat_id, init_text, reply_to=msg_id, keyboard=self._running_keyboard())
         session.progress_msg_id = prog_msg_id
 
-        # Throttled edit: update pesan progress max setiap 2 detik
-        _last_edit = [time.time() - 10]  # allow immediate first edit
+        async def flush_progress() -> None:
+            """Render status terbaru ke pesan progress, paling cepat PROGRESS_EDIT_INTERVAL sejak edit terakhir."""
+            while True:
+                delay = session.last_edit_at + PROGRESS_EDIT_INTERVAL - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                status = session.pending_status
+                session.last_edit_at = time.monotonic()
+                if session.progress_msg_id:
+                    new_text = self._build_progress(text, session, status_line=status)
+                    keyboard = self._running_keyboard()
+                    # Keyboard adalah konstanta modul → identitasnya cukup sebagai kunci
+                    h = hash((new_text, id(keyboard)))
+                    if h != session.last_update_hash:
+                        session.last_update_hash = h
+                        await self._edit(chat_id, session.progress_msg_id, new_text, keyboard=keyboard)
+                # Status baru masuk selama edit berjalan → render sekali lagi
+                if session.pending_status == status:
+                    break
 
         async def on_update(status: str) -> None:
             """Live update callback dari supervisor/agent."""
-            # Deteksi agent dari status string
-            if '[browser]' in status:
-                session.agent_used = 'browser'
-            elif '[chat]' in status:
-                session.agent_used = 'chat'
-            elif '[memory]' in status:
-                session.agent_used = 'memory'
-            # Ekstrak nama agent dari "Menggunakan X agent..."
-            for name in ('browser', 'chat', 'memory'):
-                if name in status.lower():
-                    session.agent_used = name
-
-            now = time.time()
-            if now - _last_edit[0] < 2.0:
-                return
-            _last_edit[0] = now
-
-            if session.progress_msg_id:
-                new_text = self._build_progress(text, session, status_line=status)
-                if new_text != session.last_update_text:
-                    session.last_update_text = new_text
-                    await self._edit(chat_id, session.progress_msg_id, new_text, keyboard=self._running_keyboard())
+            # Deteksi agent dari status string ("[browser] step ...", "... menggunakan chat agent...")
+            found = {m.lower() for m in _AGENT_NAME_RE.findall(status)}
+            if found:
+                session.agent_used = next(n for n in _AGENT_PRIORITY if n in found)
+
+            # Debounce trailing-edge: simpan status terbaru, satu edit terjadwal
+            # merender yang terakhir — status final tidak pernah hilang, dan
+            # pemanggil (agent) tidak menunggu round-trip Telegram.
+            session.pending_status = status
+            if session.flush_task is None or session.flush_task.done():
+                session.flush_task = asyncio.create_task(flush_progress())
 
         async def run_and_reply() -> None:
-            typing_stop = asyncio.Event()
-
-            async def typing_loop() -> None:
-                while not typing_stop.is_set():
-                    await self._typing(chat_id)
-                    try:
-                        await asyncio.wait_for(typing_stop.wait(), timeout=4.0)
-                    except asyncio.TimeoutError:
-                        pass
-
-            typing_task = asyncio.create_task(typing_loop())
+            # Indikator typing: ping pertama tertunda, selanjutnya oleh _typing_ticker
+            started = self._typing_chats[chat_id] = time.monotonic()
+            self._spawn(self._typing_first(chat_id, started))
 
             try:
-                result: SupervisorResult = await self.handle_message(
-                    task=text,
-                    channel='telegram',
-                    channel_id=str(chat_id),
-                    username=username,
-                    on_update=on_update,
-                )
-                typing_stop.set()
-                typing_task.cancel()
+                try:
+                    result: SupervisorResult = await self.handle_message(
+                        task=text,
+                        channel='telegram',
+                        channel_id=str(chat_id),
+                        username=username,
+                        on_update=on_update,
+                    )
+                finally:
+                    # Hentikan semua subtask sekaligus (selesai, error, maupun /cancel)
+                    # sebelum pesan akhir dikirim
+                    self._typing_chats.pop(chat_id, None)
+                    self._stop_progress_flush(session)
 
                 # Update progress jadi "selesai"
                 if session.progress_msg_id:
-                    elapsed = int(time.time() - session.start_time)
-                    mins, secs = divmod(elapsed, 60)
-                    elapsed_str = f'{mins}m {secs}s' if mins else f'{secs}s'
+                    elapsed = int(time.monotonic() - session.start_time)
+                    elapsed_str = _format_elapsed(elapsed)
                     agent_icon = AGENT_ICONS.get(result.agent_used, '⚡')
                     done_text = (
                         f'<b>✅ Selesai</b>\n'
-                        f'<code>{text[:60]}{"..." if len(text) > 60 else ""}</code>\n\n'
+                        f'<code>{session.task_preview}</code>\n\n'
                         f'Agent: {agent_icon} <b>{result.agent_used}</b>\n'
                         f'Waktu: <b>{elapsed_str}</b>'
                     )
@@ -552,48 +1051,66 @@ class TelegramChannel(BaseChannel):
 
                 # Kirim screenshot/attachment jika ada
                 if result.attachments:
-                    img_paths = [p for p in result.attachments if p.lower().endswith(('.png', '.jpg', '.jpeg', '.webp'))]
-                    other_paths = [p for p in result.attachments if p not in img_paths]
+                    img_paths: list[str] = []
+                    other_paths: list[str] = []
+                    for p in result.attachments:
+                        (img_paths if p.lower().endswith(IMAGE_EXTS) else other_paths).append(p)
                     if img_paths:
-                        cap = f'📸 <b>Screenshot</b> ({len(img_paths)} gambar)'
-                        for i, path in enumerate(img_paths):
-                            await self._send_photo(chat_id, path, caption=cap if i == 0 else '')
-                            if len(img_paths) > 1:
-                                await asyncio.sleep(0.3)
-                    for path in other_paths:
-                        if Path(path).exists():
-                            await self._send_document(chat_id, path)
+                        await self._send_photos(chat_id, img_paths)
+                    if other_paths:
+                        await self._send_documents(chat_id, other_paths)  # file hilang → dilewati
 
             except asyncio.CancelledError:
-                typing_stop.set()
-                typing_task.cancel()
                 if session.progress_msg_id:
-                    elapsed = int(time.time() - session.start_time)
+                    elapsed = int(time.monotonic() - session.start_time)
                     cancel_text = (
                         f'<b>🚫 Dibatalkan</b>\n'
-                        f'<code>{text[:60]}</code>\n'
+                        f'<code>{session.task_preview}</code>\n'
                         f'Berjalan {elapsed}s sebelum dibatalkan.'
                     )
                     await self._edit(chat_id, session.progress_msg_id, cancel_text, keyboard=[])
                 await self._send(chat_id, 'Task dibatalkan.', keyboard=self._main_keyboard())
 
             except Exception as e:
-                typing_stop.set()
-                typing_task.cancel()
                 self.logger.exception(f'Error: {e}')
+                err_short = html.escape(str(e)[:200])
                 if session.progress_msg_id:
-                    err_text = f'<b>❌ Error</b>\n<code>{str(e)[:200]}</code>'
+                    err_text = f'<b>❌ Error</b>\n<code>{err_short}</code>'
                     await self._edit(chat_id, session.progress_msg_id, err_text, keyboard=[])
-                await self._send(chat_id, f'❌ <code>{str(e)[:200]}</code>', keyboard=self._main_keyboard())
+                await self._send(chat_id, f'❌ <code>{err_short}</code>', keyboard=self._main_keyboard())
 
             finally:
                 session.task_coroutine = None
+                asyncio.get_running_loop().call_later(SESSION_IDLE_TTL, self._evict_if_idle, chat_id)
 
         coro = asyncio.create_task(run_and_reply())
         session.task_coroutine = coro
 
     # ─── Update dispatcher ────────────────────────────────────────────
 
+    def _spawn(self, coro: Any) -> None:
+        """Jalankan coroutine di background, referensinya dilepas otomatis saat selesai."""
+        task = asyncio.create_task(coro)
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+
+    async def _dispatch(self, update: dict) -> None:
+        """
+        Tunggu slot handler lalu proses update di background. Saat semua
+        MAX_CONCURRENT_UPDATES slot terpakai, pemanggil (poll loop / webhook)
+        ikut tertahan — backpressure, bukan antrean task yang tumbuh tanpa batas.
+        """
+        await self._handle_sem.acquire()
+        self._spawn(self._run_update(update))
+
+    async def _run_update(self, update: dict) -> None:
+        try:
+            await self._handle_update(update)
+        except Exception:
+            logger.exception(f"Gagal memproses update {update.get('update_id')}")
+        finally:
+            self._handle_sem.release()
+
     async def _handle_update(self, update: dict) -> None:
         # ── Callback query (inline keyboard) ─────────────────────────
         if 'callback_query' in update:
@@ -606,14 +1123,9 @@ class TelegramChannel(BaseChannel):
             await self._answer_callback(cq_id)
             if not self._is_allowed(chat_id):
                 return
-            if data == 'cmd:status':
-                await self._cmd_status(chat_id, msg_id)
-            elif data == 'cmd:help':
-                await self._cmd_help(chat_id, msg_id)
-            elif data == 'cmd:cancel':
-                await self._cmd_cancel(chat_id, msg_id)
-            elif data == 'cmd:memory':
-                await self._cmd_memory(chat_id, msg_id)
+            handler = self._callbacks.get(data)
+            if handler is not None:
+                await handler(chat_id, msg_id)
             return
 
         # ── Regular message ───────────────────────────────────────────
@@ -621,46 +1133,48 @@ class TelegramChannel(BaseChannel):
         if not message:
             return
 
-        chat_id: int = message['chat']['id']
-        msg_id: int = message['message_id']
-        text: str = message.get('text', '').strip()
-        username: str = message.get('from', {}).get('username', str(chat_id))
-
+        # Foto/stiker/pesan servis (tanpa teks) diabaikan sebelum kerja lain
+        text: str = message.get('text') or ''
+        if text:
+            text = text.strip()
         if not text:
             return
 
+        chat_id: int = message['chat']['id']
+        msg_id: int = message['message_id']
+        sender = message.get('from')
+        username: str = (sender and sender.get('username')) or str(chat_id)
+
         if not self._is_allowed(chat_id):
             await self._send(chat_id, '⛔ Akses ditolak.', reply_to=msg_id)
             logger.warning(f'Akses ditolak: {username} ({chat_id})')
             return
 
-        # Parse command (pisahkan @botname)
-        cmd = text.split()[0].split('@')[0].lower() if text.startswith('/') else ''
+        # Parse command sekali: kata pertama (tanpa @botname) + sisa teks
+        cmd = args = ''
+        if text.startswith('/'):
+            head, *rest = text.split(None, 1)
+            cmd, _, target = head.partition('@')
+            # /cmd@botlain di grup → bukan untuk bot ini
+            if target and target.lower() != self._bot_username:
+                return
+            cmd = cmd.lower()
+            args = rest[0].strip() if rest else ''
+
+        if not cmd:
+            # Pesan biasa → langsung ke Supervisor
+            await self._handle_message(chat_id, msg_id, text, username)
+            return
 
-        if cmd == '/start':
+        handler = self._commands.get(cmd)
+        if handler is not None:
+            await handler(chat_id, msg_id)
+        elif cmd == '/start':
             await self._cmd_start(chat_id, msg_id, username)
-        elif cmd == '/help':
-            await self._cmd_help(chat_id, msg_id)
-        elif cmd == '/status':
-            await self._cmd_status(chat_id, msg_id)
-        elif cmd == '/cancel':
-            await self._cmd_cancel(chat_id, msg_id)
-        elif cmd == '/history':
-            await self._cmd_history(chat_id, msg_id)
-        elif cmd == '/memory':
-            await self._cmd_memory(chat_id, msg_id)
-        elif cmd == '/forget':
-            await self._cmd_forget(chat_id, msg_id)
-        elif cmd == '/clear':
-            await self._cmd_clear(chat_id, msg_id)
-        elif cmd in ('/task',):
+        elif cmd == '/task':
             # Backward compat: strip /task prefix dan kirim sebagai pesan biasa
-            task_text = text[len(cmd):].strip()
-            if '@' in text.split()[0]:
-                parts = text.split(' ', 1)
-                task_text = parts[1].strip() if len(parts) > 1 else ''
-            if task_text:
-                await self._handle_message(chat_id, msg_id, task_text, username)
+            if args:
+                await self._handle_message(chat_id, msg_id, args, username)
             else:
                 await self._send(
                     chat_id,
@@ -669,25 +1183,39 @@ class TelegramChannel(BaseChannel):
                     reply_to=msg_id,
                     keyboard=self._main_keyboard(),
                 )
-        elif not text.startswith('/'):
-            # Pesan biasa → langsung ke Supervisor
-            await self._handle_message(chat_id, msg_id, text, username)
         # Perintah / yang tidak dikenal → abaikan saja
 
     # ─── Lifecycle ────────────────────────────────────────────────────
 
     async def start(self) -> None:
-        """Mulai long polling Telegram."""
-        self._session = aiohttp.ClientSession()
+        """Mulai bot: webhook jika webhook_url diset, selain itu long polling."""
+        # Session API: pool cukup besar untuk edit paralel lintas chat, koneksi TLS
+        # ditahan lebih lama dari default 15s, dan hasil DNS api.telegram.org
+        # di-cache 5 menit (default 10s). Timeout singkat untuk panggilan biasa.
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=32,
+                keepalive_timeout=75,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True,
+            ),
+            timeout=aiohttp.ClientTimeout(total=API_TIMEOUT, connect=10),
+        )
         self._running = True
+        self._stopped.clear()
+        self._typing_task = asyncio.create_task(self._typing_ticker())
 
         me = await self._api('getMe')
         if not me:
-            await self._session.close()
+            self._running = False
+            await self._cleanup()
             raise RuntimeError('Gagal terhubung ke Telegram. Periksa TELEGRAM_BOT_TOKEN.')
 
         bot_name = me.get('username', 'unknown')
-        self.logger.info(f'Telegram bot @{bot_name} terhubung. Polling...')
+        self._bot_username = bot_name.lower()
+        mode = 'webhook' if self.webhook_url else 'polling'
+        self.logger.info(f'Telegram bot @{bot_name} terhubung ({mode}).')
 
         # Update bot commands di Telegram
         await self._api(
@@ -704,25 +1232,57 @@ class TelegramChannel(BaseChannel):
             ],
         )
 
+        try:
+            if self.webhook_url:
+                await self._serve_webhook()
+            else:
+                await self._poll_loop()
+        finally:
+            await self._cleanup()
+
+    async def _poll_loop(self) -> None:
+        """Terima update via long polling getUpdates sampai stop()."""
+        # Session long-poll terpisah (satu koneksi): getUpdates yang parkir di server
+        # selama poll_timeout tidak pernah bersaing slot dengan pengiriman balasan
+        self._poll_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=1, keepalive_timeout=75, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=self.poll_timeout + POLL_TIMEOUT_MARGIN, connect=10),
+        )
+
+        # Webhook yang masih terpasang membuat getUpdates ditolak (409)
+        await self._api('deleteWebhook')
+
         # Flush pending updates lama
         try:
             await self._api('getUpdates', offset=-1, timeout=1)
         except Exception:
             pass
 
-        # Long polling loop
+        # Long polling loop. Pakai _post langsung (bukan _api yang menelan error)
+        # supaya koneksi putus / error API kena backoff, bukan loop rapat.
+        poll_params: dict[str, Any] = {
+            'offset': self._offset,
+            'timeout': self.poll_timeout,
+            'limit': GET_UPDATES_LIMIT,
+            'allowed_updates': ALLOWED_UPDATES,
+        }
         while self._running:
+            poll_params['offset'] = self._offset
             try:
-                updates = await self._api(
-                    'getUpdates',
-                    offset=self._offset,
-                    timeout=self.poll_timeout,
-                    allowed_updates=['message', 'edited_message', 'callback_query'],
-                )
-                if isinstance(updates, list):
+                data = await self._post('getUpdates', poll_params, session=self._poll_session)
+                if not data.get('ok'):
+                    raise RuntimeError(data.get('description', 'getUpdates gagal'))
+                updates = data.get('result')
+                if isinstance(updates, list) and updates:
+                    self._offset = updates[-1]['update_id'] + 1
                     for upd in updates:
-                        self._offset = upd['update_id'] + 1
-                        asyncio.create_task(self._handle_update(upd))
+                        if _needs_handling(upd):
+                            await self._dispatch(upd)
+                    # Backlog: ambil sisanya langsung (short poll), lalu kembali long-poll
+                    backlog = len(updates) >= GET_UPDATES_LIMIT
+                    poll_params['timeout'] = 0 if backlog else self.poll_timeout
+                else:
+                    poll_params['timeout'] = self.poll_timeout
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -730,16 +1290,63 @@ class TelegramChannel(BaseChannel):
                     self.logger.error(f'Polling error: {e}')
                     await asyncio.sleep(5)
 
-        await self._cleanup()
+    async def _serve_webhook(self) -> None:
+        """
+        Terima update via webhook sampai stop(): Telegram mem-POST setiap update
+        ke webhook_url, yang diteruskan (reverse proxy) ke webhook_host:webhook_port.
+        """
+        assert self.webhook_url is not None
+        app = web.Application()
+        app.router.add_post(urlsplit(self.webhook_url).path or '/', self._on_webhook)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.webhook_host, self.webhook_port).start()
+            params: dict[str, Any] = {
+                'url': self.webhook_url,
+                'allowed_updates': ALLOWED_UPDATES,
+                'max_connections': MAX_CONCURRENT_UPDATES,
+                'drop_pending_updates': True,  # sama dengan flush update lama di mode polling
+            }
+            if self.webhook_secret:
+                params['secret_token'] = self.webhook_secret
+            data = await self._post('setWebhook', params)
+            if not data.get('ok'):
+                raise RuntimeError(f"setWebhook gagal: {data.get('description', 'unknown error')}")
+            self.logger.info(f'Webhook aktif di {self.webhook_host}:{self.webhook_port}')
+            await self._stopped.wait()
+        finally:
+            await runner.cleanup()
+
+    async def _on_webhook(self, request: web.Request) -> web.Response:
+        if self.webhook_secret and request.headers.get('X-Telegram-Bot-Api-Secret-Token') != self.webhook_secret:
+            return web.Response(status=403)
+        try:
+            update = _json_loads(await request.read())
+        except ValueError:
+            return web.Response(status=400)
+        if not isinstance(update, dict):
+            # JSON valid tapi bukan objek Update (list, string, angka)
+            return web.Response(status=400)
+        # Balas 200 segera setelah dapat slot; Telegram menunggu respons sebelum
+        # mengirim update berikutnya di koneksi ini
+        if _needs_handling(update):
+            await self._dispatch(update)
+        return web.Response()
 
     async def stop(self) -> None:
         self.logger.info('Menghentikan Telegram bot...')
         self._running = False
+        self._stopped.set()
         for session in self._chats.values():
             if session.task_coroutine and not session.task_coroutine.done():
                 session.task_coroutine.cancel()
         await self._cleanup()
 
     async def _cleanup(self) -> None:
-        if self._session and not self._session.closed:
-            await self._session.close()
+        if self._typing_task is not None:
+            self._typing_task.cancel()
+            self._typing_task = None
+        for http in (self._session, self._poll_session):
+            if http and not http.closed:
+                await http.close()
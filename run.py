@@ -18,9 +18,15 @@ Environment (.env):
   OPENAI_MODEL           → Model name (default: gpt-4o)
   TELEGRAM_BOT_TOKEN     → Token dari @BotFather
   TELEGRAM_ALLOWED_USERS → Chat ID diizinkan, koma (kosong = semua)
+  TELEGRAM_WEBHOOK_URL   → URL HTTPS publik untuk mode webhook (kosong = long polling)
+  TELEGRAM_WEBHOOK_HOST  → Alamat listen server webhook (default: 0.0.0.0)
+  TELEGRAM_WEBHOOK_PORT  → Port listen server webhook (default: 8443)
+  TELEGRAM_WEBHOOK_SECRET → Secret token yang dicek di setiap request webhook
   CHROME_PATH            → Path Chrome executable
   AGENT_HEADLESS         → true/false (default: false)
   AGENT_MAX_STEPS        → Maks langkah browser agent (default: 50)
+  AGENT_REUSE_SESSION    → true/false, pakai satu browser lintas task (default: true)
+  AGENT_MAX_CONCURRENCY  → Maks task browser paralel jika session tidak di-reuse (default: 4)
   DATABASE_URL           → PostgreSQL URL
 """
 
@@ -45,6 +51,11 @@ logger = logging.getLogger('mybrowse')
 
 from browser_use.llm import ChatOpenAI
 
+try:
+    import uvloop  # event loop libuv: overhead per task/socket lebih kecil (tidak ada di Windows)
+except ImportError:
+    uvloop = None
+
 import db
 from agents.base import AgentContext, BrowserConfig
 from agents.supervisor import Supervisor
@@ -54,6 +65,8 @@ from agents.supervisor import Supervisor
 CHROME_PATH = os.getenv('CHROME_PATH', 'C:/Program Files/Google/Chrome/Application/chrome.exe')
 HEADLESS = os.getenv('AGENT_HEADLESS', 'false').lower() == 'true'
 MAX_STEPS = int(os.getenv('AGENT_MAX_STEPS', '50'))
+REUSE_SESSION = os.getenv('AGENT_REUSE_SESSION', 'true').lower() == 'true'
+MAX_CONCURRENCY = int(os.getenv('AGENT_MAX_CONCURRENCY', '4'))
 
 LLM = ChatOpenAI(
     model=os.getenv('OPENAI_MODEL', 'gpt-4o'),
@@ -65,49 +78,72 @@ BROWSER_CONFIG = BrowserConfig(
     headless=HEADLESS,
     executable_path=CHROME_PATH,
     max_steps=MAX_STEPS,
+    reuse_session=REUSE_SESSION,
+    max_concurrency=MAX_CONCURRENCY,
 )
 
-# ─── CLI Mode ─────────────────────────────────────────────────────────────────
+# ─── DB init ──────────────────────────────────────────────────────────────────
 
 
-async def run_cli(task: str) -> None:
-    """Jalankan satu task dari command line."""
+async def _init_db() -> None:
+    """Buat pool DB. Gagal tidak fatal — app tetap jalan tanpa DB."""
     try:
         await db.get_pool()
+        logger.info('Database pool siap.')
     except Exception as e:
-        logger.warning(f'DB tidak tersedia: {e}')
+        logger.warning('Database tidak tersedia: %s. Lanjut tanpa DB.', e)
 
-    supervisor = Supervisor(llm=LLM, config=BROWSER_CONFIG)
 
-    print(f'\nTask: {task}')
-    print('─' * 60)
+async def _start_db_init() -> asyncio.Task:
+    """
+    Mulai _init_db di background lalu yield sekali, supaya handshake koneksi
+    pool sudah berjalan (menunggu network) selama objek app dibangun.
+    """
+    task = asyncio.create_task(_init_db())
+    await asyncio.sleep(0)
+    return task
 
-    async def on_update(status: str) -> None:
-        print(f'  → {status}')
 
-    ctx = AgentContext(
-        task=task,
-        channel='cli',
-        channel_id='local',
-        username='cli_user',
-        on_update=on_update,
-    )
-
-    result = await supervisor.run(ctx)
-
-    print('─' * 60)
-    print(f'Agent: {result.agent_used}')
-    print(f'Status: {"✓ Selesai" if result.success else "✗ Gagal"}')
-    print(f'Langkah: {result.steps}')
-    print()
-    print(result.output)
+# ─── CLI Mode ─────────────────────────────────────────────────────────────────
 
-    if result.attachments:
-        print(f'\nAttachments: {result.attachments}')
-    if result.errors:
-        print(f'\nErrors: {result.errors}')
 
-    await db.close_pool()
+async def run_cli(task: str) -> None:
+    """Jalankan satu task dari command line."""
+    db_init = await _start_db_init()
+    supervisor = Supervisor(llm=LLM, config=BROWSER_CONFIG)
+    try:
+        await db_init
+        print(f'\nTask: {task}')
+        print('─' * 60)
+
+        async def on_update(status: str) -> None:
+            print(f'  → {status}')
+
+        ctx = AgentContext(
+            task=task,
+            channel='cli',
+            channel_id='local',
+            username='cli_user',
+            on_update=on_update,
+        )
+
+        result = await supervisor.run(ctx)
+
+        print('─' * 60)
+        print(f'Agent: {result.agent_used}')
+        print(f'Status: {"✓ Selesai" if result.success else "✗ Gagal"}')
+        print(f'Langkah: {result.steps}')
+        print()
+        print(result.output)
+
+        if result.attachments:
+            print(f'\nAttachments: {result.attachments}')
+        if result.errors:
+            print(f'\nErrors: {result.errors}')
+    finally:
+        # Satu-satunya jalur cleanup, juga saat run() atau print gagal
+        await supervisor.close()
+        await db.close_pool()
 
 
 # ─── Telegram Mode ────────────────────────────────────────────────────────────
@@ -122,12 +158,8 @@ async def run_telegram() -> None:
         print('ERROR: TELEGRAM_BOT_TOKEN belum diset di .env')
         sys.exit(1)
 
-    # Init DB
-    try:
-        await db.get_pool()
-        logger.info('Database pool siap.')
-    except Exception as e:
-        logger.warning(f'Database tidak tersedia: {e}. Lanjut tanpa DB.')
+    # Init DB, overlap dengan konstruksi Supervisor & bot
+    db_init = await _start_db_init()
 
     allowed_raw = os.getenv('TELEGRAM_ALLOWED_USERS', '').strip()
     allowed_users = [int(u.strip()) for u in allowed_raw.split(',') if u.strip().isdigit()]
@@ -137,14 +169,19 @@ async def run_telegram() -> None:
         supervisor=supervisor,
         token=token,
         allowed_users=allowed_users if allowed_users else None,
+        webhook_url=os.getenv('TELEGRAM_WEBHOOK_URL', '').strip() or None,
+        webhook_host=os.getenv('TELEGRAM_WEBHOOK_HOST', '0.0.0.0'),
+        webhook_port=int(os.getenv('TELEGRAM_WEBHOOK_PORT', '8443')),
+        webhook_secret=os.getenv('TELEGRAM_WEBHOOK_SECRET', '').strip() or None,
     )
 
     loop = asyncio.get_running_loop()
 
     async def _shutdown() -> None:
+        # Cukup hentikan bot: bot.start() lalu kembali dan finally di bawah
+        # menutup supervisor & pool tepat sekali
         logger.info('Shutdown...')
         await bot.stop()
-        await db.close_pool()
 
     def _signal_handler() -> None:
         asyncio.create_task(_shutdown())
@@ -155,10 +192,12 @@ async def run_telegram() -> None:
         except (NotImplementedError, OSError):
             pass
 
-    logger.info('Telegram bot berjalan. Ctrl+C untuk berhenti.')
     try:
+        await db_init
+        logger.info('Telegram bot berjalan. Ctrl+C untuk berhenti.')
         await bot.start()
     finally:
+        await supervisor.close()
         await db.close_pool()
 
 
@@ -167,8 +206,11 @@ async def run_telegram() -> None:
 if __name__ == '__main__':
     args = sys.argv[1:]
 
+    # Bot & agent browser sama-sama I/O-bound (HTTP, CDP, DB) → pakai uvloop jika tersedia
+    run = uvloop.run if uvloop is not None else asyncio.run
+
     if '--telegram' in args:
-        asyncio.run(run_telegram())
+        run(run_telegram())
     else:
         task = ' '.join(a for a in args if not a.startswith('--')) or 'Go to google.com and return the page title'
-        asyncio.run(run_cli(task))
+        run(run_cli(task))
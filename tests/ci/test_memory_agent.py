@@ -0,0 +1,81 @@
+"""Tests for MemoryAgent command detection (save / delete / list)."""
+
+import pytest
+
+import db
+from agents.base import AgentContext
+from agents.memory import MemoryAgent
+from agents.memory_writer import memory_writer
+
+
+@pytest.fixture
+def calls(monkeypatch):
+	"""Record which memory operation MemoryAgent performed, without touching a database."""
+	recorded: list[tuple[str, str]] = []
+
+	async def fake_delete(channel, channel_id):
+		recorded.append(('delete', ''))
+		return 3
+
+	async def fake_get_context(channel, channel_id, limit=10):
+		recorded.append(('list', ''))
+		return []
+
+	async def fake_write(*, content, **kwargs):
+		recorded.append(('save', content))
+
+	monkeypatch.setattr(db, 'memory_delete', fake_delete)
+	monkeypatch.setattr(db, 'memory_get_context', fake_get_context)
+	monkeypatch.setattr(memory_writer, 'write', fake_write)
+	return recorded
+
+
+async def run_agent(task: str):
+	return await MemoryAgent(llm=None).run(AgentContext(task=task, channel='test', channel_id='1'))
+
+
+@pytest.mark.parametrize(
+	'task, content',
+	[
+		('remember that I forget my keys', 'I forget my keys'),
+		('ingat bahwa saya sering lupa', 'saya sering lupa'),
+		('ingat bahwa saya suka show jazz', 'saya suka show jazz'),
+		('Remember that I always clear my cache', 'I always clear my cache'),
+		('catat jangan hapus email kantor', 'jangan hapus email kantor'),
+	],
+)
+async def test_explicit_save_wins_over_delete_and_list_words(calls, task, content):
+	"""Notes containing delete/list keywords are saved, never delete or list memories"""
+	result = await run_agent(task)
+
+	assert result.success
+	assert calls == [('save', content)]
+
+
+async def test_delete_command(calls):
+	result = await run_agent('hapus semua ingatanmu')
+
+	assert result.success
+	assert calls == [('delete', '')]
+
+
+@pytest.mark.parametrize('task', ['ingat apa saja tentang aku?', 'tampilkan memory', 'show memories'])
+async def test_list_command(calls, task):
+	result = await run_agent(task)
+
+	assert result.success
+	assert calls == [('list', '')]
+
+
+async def test_failed_save_is_reported_to_user(monkeypatch):
+	"""An explicit note that could not be written must not be answered with 'Tersimpan'"""
+
+	async def failing_write(**kwargs):
+		raise ConnectionError('db down')
+
+	monkeypatch.setattr(memory_writer, 'write', failing_write)
+	result = await run_agent('ingat bahwa saya alergi kacang')
+
+	assert not result.success
+	assert 'Tersimpan' not in result.output
+	assert result.errors == ['db down']
@@ -0,0 +1,121 @@
+"""Tests for top-K memory selection and the memory pack prompt block."""
+
+from datetime import datetime, timedelta
+
+import db
+from agents import memory_pack
+from agents.memory_pack import build_memory_pack, select_top_k
+
+_NOW = datetime(2026, 1, 1, 12, 0)
+
+
+def make_memories(*contents: str) -> list[db.MemoryRecord]:
+	"""Build memories newest → oldest, the order db.memory_get_context returns them in."""
+	return [
+		db.MemoryRecord(
+			id=str(i),
+			created_at=_NOW - timedelta(minutes=i),
+			channel='test',
+			channel_id='1',
+			content=content,
+			mem_type='fact',
+			source=None,
+		)
+		for i, content in enumerate(contents)
+	]
+
+
+def contents(memories: list[db.MemoryRecord]) -> list[str]:
+	return [m.content for m in memories]
+
+
+def test_returns_everything_when_within_k():
+	memories = make_memories('satu', 'dua')
+
+	result = select_top_k('apa saja', memories, k=5)
+
+	assert result == memories
+	assert result is not memories
+
+
+def test_picks_most_overlapping_memories():
+	memories = make_memories(
+		'suka minum kopi hitam',
+		'tinggal di bandung',
+		'kopi favorit adalah kopi gayo arabika',
+		'bekerja sebagai programmer python',
+		'alergi kacang',
+	)
+
+	result = select_top_k('rekomendasi kopi arabika', memories, k=2)
+
+	assert contents(result) == ['suka minum kopi hitam', 'kopi favorit adalah kopi gayo arabika']
+
+
+def test_ties_are_broken_by_recency():
+	memories = make_memories('kopi pagi', 'kopi siang', 'kopi malam', 'teh')
+
+	result = select_top_k('kopi', memories, k=2)
+
+	assert contents(result) == ['kopi pagi', 'kopi siang']
+
+
+def test_result_keeps_newest_first_order():
+	memories = make_memories('tinggal di bandung', 'alergi kacang', 'suka kopi', 'punya kucing', 'kopi tubruk')
+
+	# The oldest memory overlaps more, but must still come after newer selected ones
+	result = select_top_k('kopi tubruk kacang', memories, k=3)
+
+	assert contents(result) == ['alergi kacang', 'suka kopi', 'kopi tubruk']
+
+
+def test_falls_back_to_newest_without_overlap():
+	memories = make_memories('tinggal di bandung', 'alergi kacang', 'suka kopi', 'punya kucing')
+
+	result = select_top_k('cuaca hari ini', memories, k=2)
+
+	assert result == memories[:2]
+
+
+def test_short_tokens_do_not_count_as_overlap():
+	memories = make_memories('di rumah', 'ke kantor', 'ya ok', 'pergi ke pasar')
+
+	# "ke" and "di" are ignored, so only "pasar" matches
+	result = select_top_k('ke pasar di', memories, k=1)
+
+	assert contents(result) == ['pergi ke pasar']
+
+
+async def test_build_memory_pack_lists_oldest_first(monkeypatch):
+	memories = make_memories('kopi terbaru', 'tinggal di bandung', 'kopi terlama')
+
+	async def fake_get_context(channel, channel_id, limit=10):
+		assert limit == memory_pack.CANDIDATE_LIMIT
+		return memories
+
+	monkeypatch.setattr(db, 'memory_get_context', fake_get_context)
+
+	pack = await build_memory_pack('test', '1', 'kopi', k=2)
+
+	assert pack == db.MEMORY_HEADER + '  [fact] kopi terlama\n  [fact] kopi terbaru'
+
+
+async def test_build_memory_pack_empty_without_memories(monkeypatch):
+	async def fake_get_context(channel, channel_id, limit=10):
+		return []
+
+	monkeypatch.setattr(db, 'memory_get_context', fake_get_context)
+
+	assert await build_memory_pack('test', '1', 'kopi') == ''
+
+
+async def test_pack_matches_memory_format_for_prompt(monkeypatch):
+	"""build_memory_pack keeps the block layout of db.memory_format_for_prompt"""
+	memories = make_memories('kopi terbaru', 'kopi terlama')
+
+	async def fake_get_context(channel, channel_id, limit=10):
+		return memories[:limit]
+
+	monkeypatch.setattr(db, 'memory_get_context', fake_get_context)
+
+	assert await build_memory_pack('test', '1', 'kopi', k=2) == await db.memory_format_for_prompt('test', '1', limit=2)
@@ -0,0 +1,80 @@
+"""Tests for MemoryWriter batching, awaited writes and shutdown."""
+
+import pytest
+
+import db
+from agents.memory_writer import MemoryWriter
+
+
+@pytest.fixture
+def batches(monkeypatch):
+	"""Capture every memory_add_many batch instead of writing to PostgreSQL."""
+	recorded: list[list[tuple]] = []
+
+	async def fake_add_many(rows):
+		recorded.append(list(rows))
+
+	monkeypatch.setattr(db, 'memory_add_many', fake_add_many)
+	return recorded
+
+
+async def test_puts_are_coalesced_into_one_batch(batches):
+	writer = MemoryWriter()
+	for i in range(5):
+		writer.put('test', '1', f'memory {i}', mem_type='task_result', task_id=None)
+	await writer.close()
+
+	assert len(batches) == 1
+	assert [row[3] for row in batches[0]] == [f'memory {i}' for i in range(5)]
+	# Row layout matches db.memory_add_many: (channel, channel_id, username, content, mem_type, source, task_id)
+	assert batches[0][0] == ('test', '1', None, 'memory 0', 'task_result', None, None)
+
+
+async def test_batches_are_capped_at_max_batch(batches):
+	writer = MemoryWriter()
+	writer.MAX_BATCH = 2
+	for i in range(5):
+		writer.put('test', '1', f'memory {i}')
+	await writer.close()
+
+	assert [len(b) for b in batches] == [2, 2, 1]
+
+
+async def test_write_returns_after_its_batch_is_saved(batches):
+	writer = MemoryWriter()
+	writer.put('test', '1', 'auto')
+	await writer.write('test', '1', 'explicit', mem_type='user_note')
+
+	assert [row[3] for b in batches for row in b] == ['auto', 'explicit']
+	await writer.close()
+
+
+async def test_write_raises_when_batch_fails(monkeypatch):
+	async def failing_add_many(rows):
+		raise ConnectionError('db down')
+
+	monkeypatch.setattr(db, 'memory_add_many', failing_add_many)
+	writer = MemoryWriter()
+	writer.put('test', '1', 'auto')  # fire-and-forget: failure is only logged
+
+	with pytest.raises(ConnectionError):
+		await writer.write('test', '1', 'explicit')
+	await writer.close()
+
+
+async def test_close_flushes_pending_rows_and_stops_task(batches):
+	writer = MemoryWriter()
+	writer.put('test', '1', 'pending')
+	task = writer._task
+	await writer.close()
+
+	assert batches == [[('test', '1', None, 'pending', 'general', None, None)]]
+	assert task is not None and task.cancelled()
+	# A new put after close starts a fresh flusher
+	writer.put('test', '1', 'again')
+	await writer.close()
+	assert len(batches) == 2
+
+
+async def test_close_without_writes_is_noop():
+	await MemoryWriter().close()
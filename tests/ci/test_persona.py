@@ -0,0 +1,59 @@
+"""Tests for PersonaLoader parsing and cache consistency across reloads."""
+
+from agents.persona import PersonaLoader
+
+
+def make_loader(tmp_path, soul: str, identity: str = '') -> PersonaLoader:
+	soul_path = tmp_path / 'soul.md'
+	identity_path = tmp_path / 'identity.md'
+	soul_path.write_text(soul, encoding='utf-8')
+	identity_path.write_text(identity, encoding='utf-8')
+	return PersonaLoader(soul_path=soul_path, identity_path=identity_path)
+
+
+def test_prompt_cache_follows_reload(tmp_path):
+	loader = make_loader(tmp_path, '**Nama:** Aria\nJiwa lama')
+	assert 'Jiwa lama' in loader.build_system_prompt()
+
+	(tmp_path / 'soul.md').write_text('**Nama:** Nova\nJiwa baru', encoding='utf-8')
+	loader._reload()
+
+	assert 'Jiwa baru' in loader.build_system_prompt()
+	assert loader.ai_name == 'Nova'
+
+
+def test_cache_filled_from_stale_state_is_discarded(tmp_path):
+	"""A reload in a worker thread between reading the state and filling its cache must win"""
+	loader = make_loader(tmp_path, '**Nama:** Aria\nJiwa lama')
+	stale = loader._current()
+
+	(tmp_path / 'soul.md').write_text('**Nama:** Nova\nJiwa baru', encoding='utf-8')
+	loader._reload()  # what refresh() does via asyncio.to_thread
+	# The loop then finishes building a prompt from the state it read earlier
+	stale.static_prompt = loader._build_static_prompt(stale.data)
+	stale.browser_instruction = 'stale'
+
+	assert 'Jiwa baru' in loader.build_system_prompt()
+	assert 'Jiwa lama' not in loader.build_system_prompt()
+	assert loader.build_browser_instruction() != 'stale'
+
+
+def test_parse_fields_accepts_common_markdown_layouts():
+	parse = PersonaLoader._parse_fields
+	names = ('Nama',)
+	assert parse('**Nama:** Budi Santoso', names) == {'Nama': 'Budi Santoso'}
+	assert parse('Nama: Budi', names) == {'Nama': 'Budi'}
+	assert parse('- Nama: Budi', names) == {'Nama': 'Budi'}
+	assert parse('### Nama: Budi', names) == {'Nama': 'Budi'}
+	assert parse('1. **Nama:** Budi', names) == {'Nama': 'Budi'}
+	assert parse('| **Nama:** | Budi |', names) == {'Nama': 'Budi'}
+	assert parse('> **nama** : Budi (panggil Bud)', names) == {'Nama': 'Budi'}
+
+
+def test_parse_fields_first_occurrence_wins_and_missing_is_empty():
+	text = '# Profil\n**Nama:** Budi\n**Panggilan:** Mas Budi\n\nNama: Orang Lain'
+	assert PersonaLoader._parse_fields(text, ('Nama', 'Panggilan', 'Bahasa utama')) == {
+		'Nama': 'Budi',
+		'Panggilan': 'Mas Budi',
+		'Bahasa utama': '',
+	}
@@ -0,0 +1,75 @@
+"""Tests for the Supervisor routing cache and keyword routing."""
+
+import pytest
+
+from agents import routing_cache
+from agents.routing_cache import RoutingCache, keyword_route, normalize_task, task_key
+
+
+def test_normalize_task_ignores_case_punctuation_and_spacing():
+	assert normalize_task('  Buka   GOOGLE.com!! ') == 'buka google com'
+	assert task_key('Buka google.com') == task_key('buka  GOOGLE com?')
+
+
+def test_task_key_empty_for_blank_task():
+	assert task_key('  ?! ') == ''
+
+
+@pytest.mark.parametrize(
+	'task, agent',
+	[
+		('buka https://example.com', 'browser'),
+		('Open www.python.org', 'browser'),
+		('kunjungi tokopedia.com', 'browser'),
+		('ingat bahwa saya suka kopi', 'memory'),
+		('Remember that my name is Budi', 'memory'),
+		('buka pikiranmu', None),
+		('apa itu python?', None),
+		('ingat apa saja tentang aku?', None),
+	],
+)
+def test_keyword_route(task, agent):
+	assert keyword_route(task) == agent
+
+
+def test_get_returns_cached_agent():
+	cache = RoutingCache()
+	cache.put('Cari harga iPhone', 'browser')
+
+	assert cache.get('cari harga iphone!') == 'browser'
+	assert cache.get('cari harga samsung') is None
+
+
+def test_put_ignores_blank_task():
+	cache = RoutingCache()
+	cache.put('???', 'chat')
+
+	assert len(cache) == 0
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+	now = [1000.0]
+	monkeypatch.setattr(routing_cache.time, 'monotonic', lambda: now[0])
+	cache = RoutingCache(ttl=10.0)
+	cache.put('halo', 'chat')
+
+	now[0] += 9.9
+	assert cache.get('halo') == 'chat'
+
+	now[0] += 0.1
+	assert cache.get('halo') is None
+	assert len(cache) == 0
+
+
+def test_lru_evicts_least_recently_used():
+	cache = RoutingCache(max_size=2)
+	cache.put('task a', 'chat')
+	cache.put('task b', 'browser')
+	# Touch "a" so "b" becomes the least recently used entry
+	assert cache.get('task a') == 'chat'
+	cache.put('task c', 'memory')
+
+	assert len(cache) == 2
+	assert cache.get('task b') is None
+	assert cache.get('task a') == 'chat'
+	assert cache.get('task c') == 'memory'
@@ -0,0 +1,56 @@
+"""Tests for how the Supervisor stores a finished task's step summary and attachments."""
+
+from contextlib import asynccontextmanager
+
+import pytest
+
+import db
+from agents.base import AgentResult
+from agents.supervisor import Supervisor
+
+
+@pytest.fixture
+def events(monkeypatch):
+	"""Record DB activity in order; step_log fails like a broken insert would."""
+	recorded: list[str] = []
+
+	@asynccontextmanager
+	async def fake_db(conn=None):
+		recorded.append('acquire')
+		yield 'conn'
+		recorded.append('release')
+
+	async def failing_step_log(**kwargs):
+		recorded.append('step_log')
+		raise RuntimeError('insert failed')
+
+	async def fake_save_many(task_id, infos, conn=None):
+		assert conn == 'conn'
+		recorded.append(f'attachments:{len(infos)}')
+
+	def fake_probe(path):
+		recorded.append(f'probe:{path}')
+		return {'file_path': path}
+
+	monkeypatch.setattr(db, 'db', fake_db)
+	monkeypatch.setattr(db, 'step_log', failing_step_log)
+	monkeypatch.setattr(db, 'attachment_save_many', fake_save_many)
+	monkeypatch.setattr(Supervisor, '_probe_attachment', staticmethod(fake_probe))
+	return recorded
+
+
+async def test_attachments_are_saved_when_step_log_fails(events):
+	result = AgentResult(success=True, output='ok', agent_name='browser', attachments=['a.png', 'b.txt'])
+
+	await Supervisor._save_task_outputs('task-1', 'browser', result)
+
+	# Files are probed before a pooled connection is held
+	assert events == ['probe:a.png', 'probe:b.txt', 'acquire', 'step_log', 'attachments:2', 'release']
+
+
+async def test_no_attachment_write_without_attachments(events):
+	result = AgentResult(success=False, output='', agent_name='chat')
+
+	await Supervisor._save_task_outputs('task-1', 'chat', result)
+
+	assert events == ['acquire', 'step_log', 'release']
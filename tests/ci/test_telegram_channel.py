@@ -0,0 +1,313 @@
+"""Tests for the pure helpers of the Telegram channel (message splitting, rate limiting)."""
+
+import asyncio
+import re
+from html.parser import HTMLParser
+
+import pytest
+
+from channels.telegram import channel as telegram_channel
+from channels.telegram.channel import CHAT_SEND_BURST, TelegramChannel, _split_html, _TokenBucket
+
+_TAG_RE = re.compile(r'<[^>]*>')
+
+
+class _BalanceChecker(HTMLParser):
+	"""Collect tag nesting errors, the way Telegram's HTML parser rejects them."""
+
+	def __init__(self):
+		super().__init__(convert_charrefs=False)
+		self.stack: list[str] = []
+		self.errors: list[str] = []
+
+	def handle_starttag(self, tag, attrs):
+		self.stack.append(tag)
+
+	def handle_endtag(self, tag):
+		if not self.stack or self.stack[-1] != tag:
+			self.errors.append(f'unexpected </{tag}>')
+		else:
+			self.stack.pop()
+
+
+def assert_valid_chunks(text: str, max_len: int) -> list[str]:
+	chunks = list(_split_html(text, max_len))
+	for chunk in chunks:
+		assert len(chunk) <= max_len, chunk
+		checker = _BalanceChecker()
+		checker.feed(chunk)
+		assert not checker.errors, (chunk, checker.errors)
+		assert not checker.stack, (chunk, checker.stack)
+		assert _TAG_RE.sub('', chunk).strip(), chunk
+	# No visible text is lost or duplicated
+	assert ''.join(_TAG_RE.sub('', c) for c in chunks).split() == _TAG_RE.sub('', text).split()
+	return chunks
+
+
+def test_short_text_is_single_chunk():
+	assert list(_split_html('<b>halo</b>', 100)) == ['<b>halo</b>']
+
+
+def test_splits_at_newline_before_space():
+	text = 'baris satu\nbaris dua yang panjang'
+	assert assert_valid_chunks(text, 20)[0] == 'baris satu\n'
+
+
+def test_bold_text_split_across_messages_is_closed_and_reopened():
+	chunks = assert_valid_chunks('<b>' + 'word ' * 10 + '</b>', 20)
+	assert len(chunks) > 1
+	assert all(c.startswith('<b>') and c.endswith('</b>') for c in chunks)
+
+
+def test_multiline_pre_is_never_left_empty():
+	chunks = assert_valid_chunks('<pre>' + 'line\n' * 8 + '</pre>', 20)
+	assert all(c.startswith('<pre>') and c.endswith('</pre>') for c in chunks)
+
+
+def test_nested_tags_and_link_attributes_are_reopened():
+	text = '<b>Hasil <a href="https://example.com/a?b=1">' + 'tautan panjang ' * 6 + '</a> selesai</b>'
+	chunks = assert_valid_chunks(text, 60)
+	assert all('<a href="https://example.com/a?b=1">' in c for c in chunks[1:-1])
+
+
+def test_never_cuts_inside_tag_or_entity():
+	text = ('a &amp; b <i>c</i> ' * 20).strip()
+	for max_len in range(12, 40):
+		for chunk in assert_valid_chunks(text, max_len):
+			assert '&' not in chunk.replace('&amp;', '')
+
+
+@pytest.mark.parametrize('max_len', [50, 4096])
+def test_long_escaped_output(max_len):
+	text = '<b>✅ Selesai</b>\n\n' + '\n'.join(f'<code>{i}</code> hasil &lt;{i}&gt;' for i in range(600))
+	assert_valid_chunks(text, max_len)
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+
+class FakeClock:
+	"""Monotonic clock for the channel module; asyncio.sleep advances it instead of waiting."""
+
+	def __init__(self, monkeypatch):
+		self.now = 1000.0
+		self.sleeps: list[float] = []
+		self.advance = True  # False: sleeps are only recorded, time stands still
+		monkeypatch.setattr(telegram_channel.time, 'monotonic', lambda: self.now)
+		monkeypatch.setattr(telegram_channel.asyncio, 'sleep', self.sleep)
+
+	async def sleep(self, delay):
+		self.sleeps.append(delay)
+		if self.advance:
+			self.now += delay
+
+
+@pytest.fixture
+def clock(monkeypatch):
+	return FakeClock(monkeypatch)
+
+
+async def test_token_bucket_allows_burst_then_paces(clock):
+	bucket = _TokenBucket(rate=1.0, capacity=3)
+	for _ in range(3):
+		await bucket.acquire()
+	assert clock.sleeps == []
+
+	await bucket.acquire()
+	assert clock.sleeps == [pytest.approx(1.0)]
+
+
+async def test_token_bucket_concurrent_callers_are_served_in_order(clock):
+	clock.advance = False
+	bucket = _TokenBucket(rate=2.0, capacity=1)
+	await asyncio.gather(*(bucket.acquire() for _ in range(3)))
+
+	# Each caller reserves its token immediately and sleeps for its own deficit
+	assert clock.sleeps == [pytest.approx(0.5), pytest.approx(1.0)]
+
+
+async def test_token_bucket_refills_to_full(clock):
+	bucket = _TokenBucket(rate=1.0, capacity=3)
+	await bucket.acquire()
+	await bucket.acquire()
+	assert not bucket.is_full(clock.now)
+
+	clock.now += 1.9
+	assert not bucket.is_full(clock.now)
+	clock.now += 0.1
+	assert bucket.is_full(clock.now)
+
+
+async def test_chat_buckets_are_dropped_once_refilled(clock):
+	"""Chats that never get a ChatSession (denied users, /help) must not leak buckets"""
+	bot = TelegramChannel(supervisor=None, token='test')
+	for chat_id in range(20):
+		await bot._throttle(chat_id)
+	assert len(bot._chat_buckets) == 20
+
+	clock.now += 10
+	await bot._throttle(12345)
+	assert list(bot._chat_buckets) == [12345]
+
+
+async def test_busy_chat_bucket_is_kept(clock):
+	bot = TelegramChannel(supervisor=None, token='test')
+	for _ in range(CHAT_SEND_BURST + 2):
+		await bot._throttle(1)
+	await bot._throttle(2)
+
+	# Chat 1 is still in deficit, so its pacing state survives other chats' sends
+	assert 1 in bot._chat_buckets
+	assert not bot._chat_buckets[1].is_full(clock.now)
+
+
+# ---------------------------------------------------------------------------
+# Typing indicator
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def typing_bot(clock, monkeypatch):
+	"""TelegramChannel whose API calls are recorded; one ticker round per `_typing_ticker()` call."""
+	bot = TelegramChannel(supervisor=None, token='test')
+	bot.pinged = []
+
+	async def fake_api(method, **params):
+		bot.pinged.append(params['chat_id'])
+		return True
+
+	async def one_round(delay):
+		clock.sleeps.append(delay)
+		bot._running = False
+
+	monkeypatch.setattr(bot, '_api', fake_api)
+	monkeypatch.setattr(telegram_channel.asyncio, 'sleep', one_round)
+	bot._running = True
+	return bot
+
+
+async def test_typing_ticker_skips_chats_that_just_started(clock, typing_bot):
+	"""A tick right after a task starts must not ping it; short tasks get no chat action"""
+	typing_bot._typing_chats[1] = clock.now - 0.01
+	typing_bot._typing_chats[2] = clock.now - telegram_channel.TYPING_FIRST_DELAY
+
+	await typing_bot._typing_ticker()
+
+	assert typing_bot.pinged == [2]
+
+
+async def test_typing_first_skips_finished_task(clock, typing_bot):
+	typing_bot._typing_chats[1] = started = clock.now
+	typing_bot._typing_chats.pop(1)  # task finished within the delay
+	await typing_bot._typing_first(1, started)
+
+	# A newer task in the same chat gets its own first ping, not the old one's
+	typing_bot._typing_chats[1] = clock.now + 0.5
+	await typing_bot._typing_first(1, started)
+
+	assert typing_bot.pinged == []
+
+
+async def test_typing_first_pings_running_task(clock, typing_bot):
+	typing_bot._typing_chats[1] = started = clock.now
+	await typing_bot._typing_first(1, started)
+
+	assert typing_bot.pinged == [1]
+	assert clock.sleeps == [telegram_channel.TYPING_FIRST_DELAY]
+
+
+# ---------------------------------------------------------------------------
+# Bot API retries and webhook input
+# ---------------------------------------------------------------------------
+
+
+class _FakeResponse:
+	def __init__(self, status: int, body: bytes):
+		self.status = status
+		self._body = body
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, *exc):
+		return False
+
+	async def read(self):
+		return self._body
+
+
+class _FakeSession:
+	"""aiohttp session stand-in that answers every POST with the queued responses in order."""
+
+	def __init__(self, *responses: tuple[int, bytes]):
+		self.responses = list(responses)
+		self.calls = 0
+
+	def post(self, url, **kwargs):
+		self.calls += 1
+		return _FakeResponse(*self.responses.pop(0))
+
+
+_SERVER_ERROR = (502, b'<html>Bad Gateway</html>')
+_OK = (200, b'{"ok": true, "result": true}')
+
+
+@pytest.mark.parametrize('method', ['sendMessage', 'sendPhoto', 'sendDocument'])
+async def test_send_is_not_retried_on_server_error(clock, method):
+	"""A 5xx after a timeout may mean the message went out; resending could duplicate it"""
+	bot = TelegramChannel(supervisor=None, token='test')
+	bot._session = _FakeSession(_SERVER_ERROR, _OK)
+
+	data = await bot._post(method, {'chat_id': 1, 'text': 'halo'})
+
+	assert data == {'ok': False, 'error_code': 502}
+	assert bot._session.calls == 1
+
+
+@pytest.mark.parametrize('method', ['editMessageText', 'sendChatAction', 'getUpdates'])
+async def test_idempotent_call_is_retried_on_server_error(clock, method):
+	bot = TelegramChannel(supervisor=None, token='test')
+	bot._session = _FakeSession(_SERVER_ERROR, _OK)
+
+	data = await bot._post(method, {'chat_id': 1})
+
+	assert data['ok']
+	assert bot._session.calls == 2
+
+
+async def test_rate_limited_send_is_retried(clock):
+	bot = TelegramChannel(supervisor=None, token='test')
+	bot._session = _FakeSession((429, b'{"ok": false, "error_code": 429, "parameters": {"retry_after": 2}}'), _OK)
+
+	data = await bot._post('sendMessage', {'chat_id': 1, 'text': 'halo'})
+
+	assert data['ok']
+	assert 2.0 in clock.sleeps
+
+
+class _FakeRequest:
+	def __init__(self, body: bytes):
+		self.headers: dict[str, str] = {}
+		self._body = body
+
+	async def read(self):
+		return self._body
+
+
+@pytest.mark.parametrize('body', [b'[]', b'"update"', b'42', b'null', b'not json'])
+async def test_webhook_rejects_non_object_body(body):
+	bot = TelegramChannel(supervisor=None, token='test')
+
+	response = await bot._on_webhook(_FakeRequest(body))
+
+	assert response.status == 400
+
+
+async def test_webhook_acknowledges_ignored_update():
+	bot = TelegramChannel(supervisor=None, token='test')
+
+	response = await bot._on_webhook(_FakeRequest(b'{"update_id": 1, "message": {"sticker": {}}}'))
+
+	assert response.status == 200